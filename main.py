@@ -8,23 +8,57 @@ Usage:
 """
 
 import argparse
+import json
+import logging
+import os
 import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timezone
+from functools import partial
 
-import yaml
 
-from scout.infra import (
-    query_pipelines, query_transmission_lines, query_fiber,
-    query_substations, query_city_limits_distance,
-)
-from scout.regulatory import check_city_limits, check_attainment
-from scout.formatter import format_markdown, format_json
+# --skip choices -> results keys whose lookups are not run
+SKIP_SECTIONS = {
+    "pipelines": ("pipelines",),
+    "transmission": ("transmission_lines",),
+    "substations": ("substations",),
+    "fiber": ("fiber",),
+    "city": ("city_limits", "nearby_cities"),
+    "epa": ("attainment",),
+}
+
+CONFIG_PATH = "config.yaml"
+CONFIG_CACHE_PATH = CONFIG_PATH + ".cache.json"
+
+
+def _write_config_cache(config):
+    """Atomically write the parsed config next to config.yaml as JSON."""
+    # Skip configs JSON can't reproduce exactly (dates, non-string keys, ...)
+    try:
+        text = json.dumps(config)
+        if json.loads(text) != config:
+            return
+    except (TypeError, ValueError):
+        return
+
+    tmp = f"{CONFIG_CACHE_PATH}.{os.getpid()}.tmp"
+    try:
+        with open(tmp, "w") as f:
+            f.write(text)
+        os.replace(tmp, CONFIG_CACHE_PATH)
+    except OSError:
+        pass  # read-only checkout etc. — the cache is only an optimization
+    finally:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
 
 
 def load_config():
     try:
-        with open("config.yaml", "r") as f:
-            return yaml.safe_load(f)
+        yaml_mtime = os.stat(CONFIG_PATH).st_mtime
     except FileNotFoundError:
         return {
             "default_radius_km": 50,
@@ -33,10 +67,32 @@ def load_config():
             "transmission": {"min_voltage_kv": 69},
         }
 
+    # JSON sidecar is reused until config.yaml is modified again
+    try:
+        if os.stat(CONFIG_CACHE_PATH).st_mtime >= yaml_mtime:
+            with open(CONFIG_CACHE_PATH, "r") as f:
+                return json.load(f)
+    except (OSError, ValueError):
+        pass
+
+    # Imported lazily: a warm sidecar cache never needs PyYAML
+    import yaml
+    try:
+        from yaml import CSafeLoader as Loader
+    except ImportError:  # PyYAML built without libyaml
+        from yaml import SafeLoader as Loader
+
+    with open(CONFIG_PATH, "r") as f:
+        config = yaml.load(f, Loader=Loader)
+    _write_config_cache(config)
+    return config
+
 
 def main():
+    t0 = time.perf_counter()
     parser = argparse.ArgumentParser(
-        description="Site Scout — infrastructure lookup for Texas coordinates"
+        description="Site Scout — infrastructure lookup for Texas coordinates",
+        allow_abbrev=False,
     )
     parser.add_argument("--lat", type=float, required=True, help="Latitude")
     parser.add_argument("--lon", type=float, required=True, help="Longitude")
@@ -44,6 +100,9 @@ def main():
                         help="Search radius in km (default: 50)")
     parser.add_argument("--format", choices=["markdown", "json"],
                         default="markdown", help="Output format")
+    parser.add_argument("--skip", nargs="+", choices=list(SKIP_SECTIONS),
+                        default=[], metavar="SECTION",
+                        help="Skip these lookups: " + ", ".join(SKIP_SECTIONS))
 
     args = parser.parse_args()
 
@@ -51,6 +110,17 @@ def main():
         print("Error: invalid coordinates", file=sys.stderr)
         sys.exit(1)
 
+    # Lookup modules report recoverable failures through logging (stderr)
+    logging.basicConfig(format="%(levelname)s: %(name)s: %(message)s")
+
+    # Deferred so --help and bad arguments don't pay for requests/shapely
+    from scout.infra import (
+        query_pipelines, query_transmission_lines, query_fiber,
+        query_substations, query_city_limits_distance,
+    )
+    from scout.regulatory import check_city_limits, check_attainment
+    from scout.formatter import format_markdown, format_json
+
     config = load_config()
     radius_km = args.radius or config.get("default_radius_km", 50)
     operators = config.get("pipelines", {}).get("operators", ["Kinder Morgan", "Targa", "El Paso"])
@@ -59,10 +129,12 @@ def main():
     print(f"🔍 Scouting ({args.lat:.4f}, {args.lon:.4f}) — {radius_km}km radius...",
           file=sys.stderr)
 
+    now = datetime.now(timezone.utc)
     results = {
         "coordinates": {"lat": args.lat, "lon": args.lon},
         "radius_km": radius_km,
-        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "timestamp": now.isoformat(),
+        "_display_time": now.strftime("%Y-%m-%d %H:%M UTC"),
         "pipelines": [],
         "transmission_lines": [],
         "substations": [],
@@ -72,42 +144,62 @@ def main():
         "attainment": {},
     }
 
-    try:
-        print("📡 Querying pipelines...", file=sys.stderr)
-        results["pipelines"] = query_pipelines(
-            args.lat, args.lon, radius_km,
-            operators=operators, include_all=True,
-        )
-
-        print("⚡ Querying transmission lines...", file=sys.stderr)
-        results["transmission_lines"] = query_transmission_lines(
-            args.lat, args.lon, radius_km,
-            min_voltage_kv=min_kv,
-        )
-
-        print("🏭 Querying substations/power plants...", file=sys.stderr)
-        results["substations"] = query_substations(args.lat, args.lon, radius_km)
-
-        print("🌐 Checking fiber...", file=sys.stderr)
-        results["fiber"] = query_fiber(args.lat, args.lon)
-
-        print("🏙️ Checking city limits...", file=sys.stderr)
-        results["city_limits"] = check_city_limits(args.lat, args.lon)
-
-        print("📏 Querying city limit distances...", file=sys.stderr)
-        results["nearby_cities"] = query_city_limits_distance(args.lat, args.lon, radius_km)
-
-        print("🌿 Checking EPA attainment...", file=sys.stderr)
-        results["attainment"] = check_attainment(args.lat, args.lon)
+    # Every lookup is an independent HTTP round-trip, so fan them out and
+    # wait on the slowest one instead of the sum of all of them.
+    lat, lon = args.lat, args.lon
+    # The markdown report lists only the 15 nearest pipelines/substations
+    # and the 10 nearest transmission lines; JSON output keeps everything
+    markdown = args.format == "markdown"
+    limit = 15 if markdown else None
+    tx_limit = 10 if markdown else None
+    tasks = {
+        "pipelines": ("📡 Querying pipelines...", partial(
+            query_pipelines, lat, lon, radius_km,
+            operators=operators, include_all=True, limit=limit,
+        )),
+        "transmission_lines": ("⚡ Querying transmission lines...", partial(
+            query_transmission_lines, lat, lon, radius_km,
+            min_voltage_kv=min_kv, limit=tx_limit,
+        )),
+        "substations": ("🏭 Querying substations/power plants...",
+                        partial(query_substations, lat, lon, radius_km, limit=limit)),
+        "fiber": ("🌐 Checking fiber...", partial(query_fiber, lat, lon)),
+        "city_limits": ("🏙️ Checking city limits...",
+                        partial(check_city_limits, lat, lon)),
+        "nearby_cities": ("📏 Querying city limit distances...",
+                          partial(query_city_limits_distance, lat, lon, radius_km)),
+        "attainment": ("🌿 Checking EPA attainment...",
+                       partial(check_attainment, lat, lon)),
+    }
 
-    except Exception as e:
-        print(f"Error: {e}", file=sys.stderr)
-        sys.exit(1)
+    # Recorded so the formatters don't present skipped lookups as empty results
+    skipped = [key for section in args.skip for key in SKIP_SECTIONS[section]]
+    for key in skipped:
+        tasks.pop(key, None)
+    if skipped:
+        results["skipped"] = skipped
+
+    with ThreadPoolExecutor(max_workers=max(len(tasks), 1)) as pool:
+        futures = {}
+        for key, (message, fn) in tasks.items():
+            print(message, file=sys.stderr)
+            futures[pool.submit(fn)] = key
+
+        for future in as_completed(futures):
+            key = futures[future]
+            try:
+                results[key] = future.result()
+            except Exception as e:
+                # Keep the other sections; this one stays at its empty default
+                print(f"Warning: {key} lookup failed: {e}", file=sys.stderr)
+
+    results["duration_ms"] = int((time.perf_counter() - t0) * 1000)
+    print(f"⏱️ Done in {results['duration_ms']} ms", file=sys.stderr)
 
     if args.format == "json":
-        print(format_json(results))
+        format_json(results, fp=sys.stdout)
     else:
-        print(format_markdown(results))
+        format_markdown(results, fp=sys.stdout)
 
 
 if __name__ == "__main__":
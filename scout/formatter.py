@@ -1,127 +1,100 @@
 """
 Output formatters for Site Scout reports.
 Includes verification links (Google Maps, data source URLs) for every result.
+
+Feature lists in `results` are expected nearest-first: the query_* functions
+in scout.infra sort by distance_km (distance_to_boundary_km for nearby
+cities) before returning. The formatters rely on that ordering for the
+#1, #2, ... ranks and for taking the first N rows, and never re-sort.
 """
 
+import io
 import json
 from datetime import datetime, timezone
-from typing import Dict, Any, List
+from itertools import islice
+from typing import Any, Callable, Dict, List, Optional, TextIO
 
+try:
+    import orjson
+except ImportError:  # optional: fall back to the stdlib encoder
+    orjson = None
 
-def format_markdown(results: Dict[str, Any]) -> str:
-    """Format results as human-readable report with verification links."""
-    coords = results["coordinates"]
-    lat, lon = coords["lat"], coords["lon"]
-    radius = results["radius_km"]
-    ts = results.get("timestamp", "")
 
-    try:
-        dt = datetime.fromisoformat(ts.replace("Z", "+00:00"))
-        time_str = dt.strftime("%Y-%m-%d %H:%M UTC")
-    except Exception:
-        time_str = ts
+# Section banners for the radius-bounded feature lists
+PIPELINES_BANNER = "═══ 🔴 NATURAL GAS PIPELINES ({radius}km radius) ═══\n\n"
+TRANSMISSION_BANNER = "═══ 🟡 TRANSMISSION LINES ({radius}km radius) ═══\n\n"
+SUBSTATIONS_BANNER = "═══ 🏭 SUBSTATIONS ({radius}km radius) ═══\n\n"
 
-    out: List[str] = []
-    a = out.append
+# Body of a section whose lookup was turned off with --skip
+SKIPPED_LINE = "  ⏭️ Skipped (--skip)\n\n"
 
-    a(f"📍 Site Scout Report — ({lat:.4f}, {lon:.4f})")
-    a(f"Generated: {time_str}")
-    a(f"🗺️ Google Maps: https://www.google.com/maps?q={lat},{lon}")
-    a("")
+# Per-feature row templates (filled with str.format_map), newline-terminated
+PIPELINE_ROW = (
+    "  #{i}  {operator}{tag}\n"
+    "      Distance: {distance_km} km ({distance_mi} mi) — Direction: {direction}\n"
+    "      Type: {type} | Status: {status}\n"
+)
+TRANSMISSION_ROW = (
+    "  #{i}  {owner} — {voltage_kv} kV\n"
+    "      Distance: {distance_km} km ({distance_mi} mi) — Direction: {direction} | Status: {status}\n"
+)
+SUBSTATION_ROW = (
+    "  #{i}  {name} ({type}) — {status_icon} {status} | Lines: {lines}\n"
+    "      Distance: {distance_km} km ({distance_mi} mi) — Direction: {direction}\n"
+)
 
-    # ---- Pipelines ----
-    a(f"═══ 🔴 NATURAL GAS PIPELINES ({radius}km radius) ═══")
-    a("")
+# Fallbacks for optional feature fields; rows are merged over these once so
+# the loops below can index directly instead of calling .get() per field
+PIPELINE_DEFAULTS = {
+    "operator": "Unknown", "type": "?", "status": "?", "direction": "?",
+    "is_target_operator": False, "nearest_point_lat": None, "nearest_point_lon": None,
+    "google_maps_link": "", "eia_record_url": None, "data_source": "EIA",
+}
+TRANSMISSION_DEFAULTS = {
+    "owner": "Unknown", "voltage_kv": "?", "status": "?", "direction": "?",
+    "nearest_point_lat": None, "nearest_point_lon": None,
+    "google_maps_link": "", "hifld_record_url": None, "data_source": "HIFLD",
+}
+SUBSTATION_DEFAULTS = {
+    "name": "Unknown", "type": "?", "status": "?", "lines": 0, "direction": "?",
+    "city": "", "state": "", "lat": None, "lon": None,
+    "google_maps_link": "", "hifld_record_url": None, "data_source": "HIFLD",
+}
 
-    pipelines = results.get("pipelines", [])
-    if pipelines:
-        for i, p in enumerate(pipelines[:15], 1):
-            op = p.get("operator", "Unknown")
-            tag = " ⭐" if p.get("is_target_operator") else ""
-            a(f"  #{i}  {op}{tag}")
-            a(f"      Distance: {p['distance_km']} km ({p['distance_mi']} mi) — Direction: {p.get('direction', '?')}")
-            a(f"      Type: {p.get('type', '?')} | Status: {p.get('status', '?')}")
-            nlat = p.get("nearest_point_lat")
-            nlon = p.get("nearest_point_lon")
-            if nlat and nlon:
-                a(f"      📍 Nearest: ({nlat}, {nlon})")
-                a(f"      🗺️ {p.get('google_maps_link', '')}")
-            eia_url = p.get("eia_record_url")
-            if eia_url:
-                a(f"      🔗 EIA Record: {eia_url}")
-            a(f"      📊 Source: {p.get('data_source', 'EIA')}")
-            a("")
-    else:
-        a("  ❌ No pipelines found within radius")
-        a("")
+# Icons for the HIFLD substation STATUS values; anything else mentioning
+# construction gets 🔨, the rest ⚪
+SUBSTATION_STATUS_ICONS = {
+    "IN SERVICE": "✅",
+    "UNDER CONSTRUCTION": "🔨",
+    "NOT AVAILABLE": "⚪",
+    "NOT NECESSARILY IN SERVICE": "⚪",
+    "?": "⚪",
+    None: "⚪",
+}
 
-    # ---- Transmission Lines ----
-    a(f"═══ 🟡 TRANSMISSION LINES ({radius}km radius) ═══")
-    a("")
+# Manual-lookup footer; only the substation map is centred on the query point
+DATA_SOURCES_BLOCK = (
+    "═══ 📚 DATA SOURCES (手动查询入口) ═══\n\n"
+    "  管道: https://services2.arcgis.com/FiaPA4ga0iQKduv3/arcgis/rest/services/Natural_Gas_Interstate_and_Intrastate_Pipelines_1/FeatureServer/0\n"
+    "  输电线: https://services1.arcgis.com/Hp6G80Pky0om7QvQ/arcgis/rest/services/Electric_Power_Transmission_Lines/FeatureServer/0\n"
+    "  变电站: https://services6.arcgis.com/OO2s4OoyCZkYJ6oE/arcgis/rest/services/Substations/FeatureServer/0\n"
+    "  变电站地图: https://www.arcgis.com/apps/mapviewer/index.html?url=https://services6.arcgis.com/OO2s4OoyCZkYJ6oE/arcgis/rest/services/Substations/FeatureServer/0&center={lon},{lat}&level=10\n"
+    "  光纤(FCC BDC): https://services8.arcgis.com/peDZJliSvYims39Q/arcgis/rest/services/FCC_Broadband_Data_Collection_December_2024_View/FeatureServer\n"
+    "  City Limits: https://tigerweb.geo.census.gov/arcgis/rest/services/TIGERweb/Places_CouSub_ConCity_SubMCD/MapServer/4\n"
+    "  EPA Green Book: https://www.epa.gov/green-book\n"
+)
 
-    tx_lines = results.get("transmission_lines", [])
-    if tx_lines:
-        for i, t in enumerate(tx_lines[:10], 1):
-            owner = t.get("owner", "Unknown")
-            v = t.get("voltage_kv", "?")
-            a(f"  #{i}  {owner} — {v} kV")
-            a(f"      Distance: {t['distance_km']} km ({t['distance_mi']} mi) — Direction: {t.get('direction', '?')} | Status: {t.get('status', '?')}")
-            nlat = t.get("nearest_point_lat")
-            nlon = t.get("nearest_point_lon")
-            if nlat and nlon:
-                a(f"      📍 Nearest: ({nlat}, {nlon})")
-                a(f"      🗺️ {t.get('google_maps_link', '')}")
-            hifld_url = t.get("hifld_record_url")
-            if hifld_url:
-                a(f"      🔗 HIFLD Record: {hifld_url}")
-            a(f"      📊 Source: {t.get('data_source', 'HIFLD')}")
-            a("")
-    else:
-        a("  ❌ No transmission lines found within radius")
-        a("")
 
-    # ---- Substations ----
-    a(f"═══ 🏭 SUBSTATIONS ({radius}km radius) ═══")
-    a("")
-    subs = results.get("substations", [])
-    if subs:
-        for i, s in enumerate(subs[:15], 1):
-            name = s.get("name", "Unknown")
-            stype = s.get("type", "?")
-            status = s.get("status", "?")
-            lines = s.get("lines", 0)
-            city = s.get("city", "")
-            status_icon = "✅" if status == "IN SERVICE" else ("🔨" if "CONSTRUCTION" in (status or "").upper() else "⚪")
-            a(f"  #{i}  {name} ({stype}) — {status_icon} {status} | Lines: {lines}")
-            a(f"      Distance: {s['distance_km']} km ({s['distance_mi']} mi) — Direction: {s.get('direction', '?')}")
-            if city:
-                a(f"      City: {city}, {s.get('state', '')}")
-            slat = s.get("lat")
-            slon = s.get("lon")
-            if slat and slon:
-                a(f"      📍 ({slat}, {slon})")
-                a(f"      🗺️ {s.get('google_maps_link', '')}")
-            hifld_url = s.get("hifld_record_url")
-            if hifld_url:
-                a(f"      🔗 HIFLD Record: {hifld_url}")
-            a(f"      📊 Source: {s.get('data_source', 'HIFLD')}")
-            a("")
-    else:
-        a("  ❌ No substations found within radius")
-        a("")
-
-    # ---- Fiber ----
-    a("═══ 🔵 FIBER / BROADBAND ═══")
-    a("")
-    fiber = results.get("fiber", {})
+def _render_fiber(fiber: Dict[str, Any], w: Callable[[str], Any]) -> None:
+    """Fiber / broadband section body."""
     has_fiber = fiber.get("has_fiber")
 
     if has_fiber is True:
-        a("  Status: ✅ Fiber Available")
+        w("  Status: ✅ Fiber Available\n")
     elif has_fiber is False:
-        a("  Status: ❌ No Fiber")
+        w("  Status: ❌ No Fiber\n")
     else:
-        a("  Status: ❓ Unknown")
+        w("  Status: ❓ Unknown\n")
 
     block = fiber.get("block_data", {})
     if block:
@@ -129,99 +102,252 @@ def format_markdown(results: Dict[str, Any]) -> str:
         served = block.get("served", 0)
         unserved = block.get("unserved", 0)
         underserved = block.get("underserved", 0)
-        a(f"  📍 Census Block: {block.get('geoid', '?')}")
-        a(f"  Locations (BSL): {total} total | {served} served | {unserved} unserved | {underserved} underserved")
-        a(f"  Fiber served: {block.get('fiber_served', 0)} | Cable: {block.get('cable_served', 0)} | Fixed Wireless: {block.get('fixed_wireless_served', 0)}")
-        a(f"  Providers: {block.get('unique_providers', 0)} total | {block.get('fiber_providers', 0)} fiber | {block.get('cable_providers', 0)} cable")
+        w(
+            f"  📍 Census Block: {block.get('geoid', '?')}\n"
+            f"  Locations (BSL): {total} total | {served} served | {unserved} unserved | {underserved} underserved\n"
+            f"  Fiber served: {block.get('fiber_served', 0)} | Cable: {block.get('cable_served', 0)} | Fixed Wireless: {block.get('fixed_wireless_served', 0)}\n"
+            f"  Providers: {block.get('unique_providers', 0)} total | {block.get('fiber_providers', 0)} fiber | {block.get('cable_providers', 0)} cable\n"
+        )
 
     county = fiber.get("county_data", {})
     if county:
-        a(f"  📊 County overview ({block.get('county', '?')}):")
-        a(f"     {county.get('total_locations', 0)} BSLs | {county.get('served_pct', 0)}% served | {county.get('fiber_served', 0)} fiber | {county.get('fiber_providers', 0)} fiber ISPs")
+        w(
+            f"  📊 County overview ({block.get('county', '?')}):\n"
+            f"     {county.get('total_locations', 0)} BSLs | {county.get('served_pct', 0)}% served | {county.get('fiber_served', 0)} fiber | {county.get('fiber_providers', 0)} fiber ISPs\n"
+        )
 
     manual = fiber.get("manual_check_url")
     if manual:
-        a(f"  🔗 Verify: {manual}")
-    a(f"  📊 Source: {fiber.get('data_source', 'FCC BDC')}")
-    a("")
-
-    # ---- City Limits ----
-    a("═══ 🏙️ CITY LIMITS ═══")
-    a("")
-    cl = results.get("city_limits", {})
+        w(f"  🔗 Verify: {manual}\n")
+    w(f"  📊 Source: {fiber.get('data_source', 'FCC BDC')}\n\n")
+
+
+def _render_city_limits(cl: Dict[str, Any], w: Callable[[str], Any]) -> None:
+    """City-limits section body."""
     if cl.get("in_city"):
-        a(f"  Status: ✅ Inside City Limits — {cl.get('city_name', '?')}, TX")
+        w(f"  Status: ✅ Inside City Limits — {cl.get('city_name', '?')}, TX\n")
     else:
-        a("  Status: ❌ Outside City Limits")
-    if cl.get("county"):
-        a(f"  County: {cl['county']}")
-    if cl.get("census_tract"):
-        a(f"  Census Tract: {cl['census_tract']}")
-    a("  📊 Source: US Census Bureau Geocoder API")
-    if cl.get("error"):
-        a(f"  ⚠️ {cl['error']}")
-    a("")
-
-    # ---- Nearby Cities (boundary distance) ----
-    nearby = results.get("nearby_cities", [])
-    if nearby:
-        a(f"  📏 Distance to Nearest City Boundaries:")
-        a("")
-        for i, c in enumerate(nearby[:8], 1):
-            name = c.get("name", "?")
-            ctype = c.get("type", "")
-            inside = c.get("inside", False)
-            bd = c.get("distance_to_boundary_km", "?")
-            bd_mi = c.get("distance_to_boundary_mi", "?")
-            cd = c.get("distance_to_center_km", "?")
-
-            if inside:
-                a(f"  #{i}  {name} — ✅ INSIDE (boundary {bd} km / {bd_mi} mi away)")
-            else:
-                a(f"  #{i}  {name} — {bd} km ({bd_mi} mi) to boundary | {cd} km to center")
-            blat = c.get("nearest_boundary_lat")
-            blon = c.get("nearest_boundary_lon")
-            if blat and blon:
-                a(f"      📍 Nearest edge: ({blat}, {blon})")
-                a(f"      🗺️ {c.get('google_maps_link', '')}")
-            a(f"      📊 Source: {c.get('data_source', 'Census TIGERweb')}")
-            a("")
-
-    # ---- EPA ----
-    a("═══ 🌿 EPA ATTAINMENT ═══")
-    a("")
-    att = results.get("attainment", {})
+        w("  Status: ❌ Outside City Limits\n")
+    cl_county = cl.get("county")
+    if cl_county:
+        w(f"  County: {cl_county}\n")
+    tract = cl.get("census_tract")
+    if tract:
+        w(f"  Census Tract: {tract}\n")
+    w("  📊 Source: US Census Bureau Geocoder API\n")
+    cl_error = cl.get("error")
+    if cl_error:
+        w(f"  ⚠️ {cl_error}\n")
+    w("\n")
+
+
+def _render_nearby_cities(nearby: List[Dict[str, Any]], w: Callable[[str], Any]) -> None:
+    """Distance-to-boundary list for nearby incorporated places (no banner)."""
+    if not nearby:
+        return
+    w("  📏 Distance to Nearest City Boundaries:\n\n")
+    for i, c in enumerate(islice(nearby, 8), 1):
+        name = c.get("name", "?")
+        ctype = c.get("type", "")
+        inside = c.get("inside", False)
+        bd = c.get("distance_to_boundary_km", "?")
+        bd_mi = c.get("distance_to_boundary_mi", "?")
+        cd = c.get("distance_to_center_km", "?")
+
+        if inside:
+            w(f"  #{i}  {name} — ✅ INSIDE (boundary {bd} km / {bd_mi} mi away)\n")
+        else:
+            w(f"  #{i}  {name} — {bd} km ({bd_mi} mi) to boundary | {cd} km to center\n")
+        blat = c.get("nearest_boundary_lat")
+        blon = c.get("nearest_boundary_lon")
+        if blat and blon:
+            w(
+                f"      📍 Nearest edge: ({blat}, {blon})\n"
+                f"      🗺️ {c.get('google_maps_link', '')}\n"
+            )
+        w(f"      📊 Source: {c.get('data_source', 'Census TIGERweb')}\n\n")
+
+
+def _render_attainment(att: Dict[str, Any], w: Callable[[str], Any]) -> None:
+    """EPA attainment section body."""
+    att_county = att.get("county", "?")
     if att.get("attainment", True):
-        a("  Status: ✅ Attainment Area")
-        a(f"  County: {att.get('county', '?')}")
-        a("  All criteria pollutants in attainment")
+        w(
+            "  Status: ✅ Attainment Area\n"
+            f"  County: {att_county}\n"
+            "  All criteria pollutants in attainment\n"
+        )
     else:
-        a("  Status: ❌ Nonattainment Area")
-        a(f"  County: {att.get('county', '?')}")
+        w(
+            "  Status: ❌ Nonattainment Area\n"
+            f"  County: {att_county}\n"
+        )
         pols = att.get("pollutants_nonattainment", [])
         if pols:
-            a(f"  Nonattainment: {', '.join(pols)}")
-    a("  📊 Source: EPA Green Book")
-    if att.get("error"):
-        a(f"  ⚠️ {att['error']}")
-    a("")
+            w(f"  Nonattainment: {', '.join(pols)}\n")
+    w("  📊 Source: EPA Green Book\n")
+    att_error = att.get("error")
+    if att_error:
+        w(f"  ⚠️ {att_error}\n")
+    w("\n")
+
+
+# (banner, results key, renderer) for the dict-backed sections after the
+# feature lists. A banner of None renders the body without a header.
+DETAIL_SECTIONS = (
+    ("═══ 🔵 FIBER / BROADBAND ═══", "fiber", _render_fiber),
+    ("═══ 🏙️ CITY LIMITS ═══", "city_limits", _render_city_limits),
+    (None, "nearby_cities", _render_nearby_cities),
+    ("═══ 🌿 EPA ATTAINMENT ═══", "attainment", _render_attainment),
+)
+
+
+def format_markdown(results: Dict[str, Any], fp: Optional[TextIO] = None) -> Optional[str]:
+    """
+    Format results as human-readable report with verification links.
+
+    If fp is given, the report (plus a trailing newline) is written straight to
+    it and None is returned; otherwise the report string is returned.
+    """
+    coords = results["coordinates"]
+    lat, lon = coords["lat"], coords["lon"]
+    radius = results["radius_km"]
+    pipelines = results.get("pipelines", [])
+    tx_lines = results.get("transmission_lines", [])
+    subs = results.get("substations", [])
+    # results keys whose lookups did not run; never report them as empty
+    skipped = set(results.get("skipped", ()))
+
+    # main() pre-formats the display time; parse the ISO string only as a fallback
+    time_str = results.get("_display_time")
+    if time_str is None:
+        ts = results.get("timestamp", "")
+        try:
+            dt = datetime.fromisoformat(ts.replace("Z", "+00:00"))
+            time_str = dt.strftime("%Y-%m-%d %H:%M UTC")
+        except Exception:
+            time_str = ts
+
+    buf = fp if fp is not None else io.StringIO()
+    w = buf.write
+
+    w(
+        f"📍 Site Scout Report — ({lat:.4f}, {lon:.4f})\n"
+        f"Generated: {time_str}\n"
+        f"🗺️ Google Maps: https://www.google.com/maps?q={lat},{lon}\n\n"
+    )
+
+    # ---- Pipelines ----
+    w(PIPELINES_BANNER.format(radius=radius))
+
+    if "pipelines" in skipped:
+        w(SKIPPED_LINE)
+    elif pipelines:
+        for i, p in enumerate(islice(pipelines, 15), 1):
+            p = {**PIPELINE_DEFAULTS, **p, "i": i}
+            p["tag"] = " ⭐" if p["is_target_operator"] else ""
+            w(PIPELINE_ROW.format_map(p))
+            nlat = p["nearest_point_lat"]
+            nlon = p["nearest_point_lon"]
+            if nlat and nlon:
+                w(
+                    f"      📍 Nearest: ({nlat}, {nlon})\n"
+                    f"      🗺️ {p['google_maps_link']}\n"
+                )
+            eia_url = p["eia_record_url"]
+            if eia_url:
+                w(f"      🔗 EIA Record: {eia_url}\n")
+            w(f"      📊 Source: {p['data_source']}\n\n")
+    else:
+        w("  ❌ No pipelines found within radius\n\n")
+
+    # ---- Transmission Lines ----
+    w(TRANSMISSION_BANNER.format(radius=radius))
+
+    if "transmission_lines" in skipped:
+        w(SKIPPED_LINE)
+    elif tx_lines:
+        for i, t in enumerate(islice(tx_lines, 10), 1):
+            t = {**TRANSMISSION_DEFAULTS, **t, "i": i}
+            w(TRANSMISSION_ROW.format_map(t))
+            nlat = t["nearest_point_lat"]
+            nlon = t["nearest_point_lon"]
+            if nlat and nlon:
+                w(
+                    f"      📍 Nearest: ({nlat}, {nlon})\n"
+                    f"      🗺️ {t['google_maps_link']}\n"
+                )
+            hifld_url = t["hifld_record_url"]
+            if hifld_url:
+                w(f"      🔗 HIFLD Record: {hifld_url}\n")
+            w(f"      📊 Source: {t['data_source']}\n\n")
+    else:
+        w("  ❌ No transmission lines found within radius\n\n")
+
+    # ---- Substations ----
+    w(SUBSTATIONS_BANNER.format(radius=radius))
+    if "substations" in skipped:
+        w(SKIPPED_LINE)
+    elif subs:
+        for i, s in enumerate(islice(subs, 15), 1):
+            s = {**SUBSTATION_DEFAULTS, **s, "i": i}
+            status = s["status"]
+            icon = SUBSTATION_STATUS_ICONS.get(status)
+            if icon is None:  # unlisted status: fall back to the substring rule
+                icon = "🔨" if "CONSTRUCTION" in (status or "").upper() else "⚪"
+            s["status_icon"] = icon
+            w(SUBSTATION_ROW.format_map(s))
+            city = s["city"]
+            if city:
+                w(f"      City: {city}, {s['state']}\n")
+            slat = s["lat"]
+            slon = s["lon"]
+            if slat and slon:
+                w(
+                    f"      📍 ({slat}, {slon})\n"
+                    f"      🗺️ {s['google_maps_link']}\n"
+                )
+            hifld_url = s["hifld_record_url"]
+            if hifld_url:
+                w(f"      🔗 HIFLD Record: {hifld_url}\n")
+            w(f"      📊 Source: {s['data_source']}\n\n")
+    else:
+        w("  ❌ No substations found within radius\n\n")
+
+    for banner, key, render in DETAIL_SECTIONS:
+        if key in skipped:
+            if banner is not None:  # headerless sections just disappear
+                w(f"{banner}\n\n{SKIPPED_LINE}")
+            continue
+        if banner is not None:
+            w(f"{banner}\n\n")
+        render(results.get(key, {}), w)
 
     # ---- Data Sources Reference ----
-    a("═══ 📚 DATA SOURCES (手动查询入口) ═══")
-    a("")
-    a(f"  管道: https://services2.arcgis.com/FiaPA4ga0iQKduv3/arcgis/rest/services/Natural_Gas_Interstate_and_Intrastate_Pipelines_1/FeatureServer/0")
-    a(f"  输电线: https://services1.arcgis.com/Hp6G80Pky0om7QvQ/arcgis/rest/services/Electric_Power_Transmission_Lines/FeatureServer/0")
-    a(f"  变电站: https://services6.arcgis.com/OO2s4OoyCZkYJ6oE/arcgis/rest/services/Substations/FeatureServer/0")
-    a(f"  变电站地图: https://www.arcgis.com/apps/mapviewer/index.html?url=https://services6.arcgis.com/OO2s4OoyCZkYJ6oE/arcgis/rest/services/Substations/FeatureServer/0&center={lon},{lat}&level=10")
-    a(f"  光纤(FCC BDC): https://services8.arcgis.com/peDZJliSvYims39Q/arcgis/rest/services/FCC_Broadband_Data_Collection_December_2024_View/FeatureServer")
-    a(f"  City Limits: https://tigerweb.geo.census.gov/arcgis/rest/services/TIGERweb/Places_CouSub_ConCity_SubMCD/MapServer/4")
-    a(f"  EPA Green Book: https://www.epa.gov/green-book")
+    w(DATA_SOURCES_BLOCK.format(lat=lat, lon=lon))
+
+    if fp is not None:
+        return None
+    return buf.getvalue()[:-1]  # no trailing newline, as before
 
-    return "\n".join(out)
 
+# (group, section, results key) for the sections of the JSON document
+JSON_SECTIONS = (
+    ("infrastructure", "pipelines", "pipelines"),
+    ("infrastructure", "transmission_lines", "transmission_lines"),
+    ("connectivity", "fiber", "fiber"),
+    ("regulatory", "city_limits", "city_limits"),
+    ("regulatory", "epa_attainment", "attainment"),
+)
 
-def format_json(results: Dict[str, Any]) -> str:
-    """Format results as clean JSON."""
+
+def format_json(results: Dict[str, Any], fp: Optional[TextIO] = None) -> Optional[str]:
+    """
+    Format results as clean JSON.
+
+    If fp is given, the document (plus a trailing newline) is streamed to it
+    and None is returned; otherwise the JSON string is returned.
+    """
     clean = {
         "site_scout_version": "1.1.0",
         "query": {
@@ -245,4 +371,27 @@ def format_json(results: Dict[str, Any]) -> str:
             "epa_attainment": results.get("attainment", {}),
         },
     }
+
+    # Sections whose lookups were skipped are left out rather than
+    # reported as empty results
+    skipped = results.get("skipped")
+    if skipped:
+        clean["query"]["skipped"] = list(skipped)
+        for group, section, key in JSON_SECTIONS:
+            if key in skipped:
+                del clean[group][section]
+    if orjson is not None:
+        text = orjson.dumps(
+            clean, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+        ).decode()
+        if fp is not None:
+            fp.write(text)
+            fp.write("\n")
+            return None
+        return text
+
+    if fp is not None:
+        json.dump(clean, fp, indent=2, ensure_ascii=False)
+        fp.write("\n")
+        return None
     return json.dumps(clean, indent=2, ensure_ascii=False)
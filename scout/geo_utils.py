@@ -3,7 +3,9 @@ Geographic utilities for distance calculations and spatial operations
 """
 
 import math
-from typing import List
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
 
 
 def haversine_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
@@ -26,14 +28,204 @@ def haversine_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> fl
     return R * c
 
 
+def haversine_distance_vec(lat1: float, lon1: float, lats2, lons2) -> np.ndarray:
+    """
+    Vectorized haversine from one point to many points
+    lats2/lons2 are array-likes in decimal degrees; returns distances in km
+    """
+    lat1_r = math.radians(lat1)
+    lon1_r = math.radians(lon1)
+    lats2_r = np.radians(np.asarray(lats2, dtype=np.float64))
+    lons2_r = np.radians(np.asarray(lons2, dtype=np.float64))
+
+    dlat = lats2_r - lat1_r
+    dlon = lons2_r - lon1_r
+    a = np.sin(dlat / 2) ** 2 + math.cos(lat1_r) * np.cos(lats2_r) * np.sin(dlon / 2) ** 2
+    return 2 * 6371.0 * np.arcsin(np.sqrt(a))
+
+
+# Kilometres per degree of latitude on the haversine sphere
+KM_PER_DEG = 6371.0 * math.pi / 180
+
+
+def pack_paths(paths: Sequence[Sequence]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Pack ArcGIS polyline paths into CSR form for nearest_on_polyline
+    Returns (coords, offsets): coords is an (N, 2) array of (lon, lat) for all
+    vertices, and path k is coords[offsets[k]:offsets[k + 1]]
+    """
+    offsets = np.zeros(len(paths) + 1, dtype=np.intp)
+    np.cumsum([len(path) for path in paths], out=offsets[1:])
+    coords = np.array(
+        [(c[0], c[1]) for path in paths for c in path], dtype=np.float64
+    ).reshape(-1, 2)
+    return coords, offsets
+
+
+def _closest_per_group(x: np.ndarray, y: np.ndarray, seg_a: np.ndarray,
+                       seg_b: np.ndarray, seg_group: np.ndarray,
+                       best: Tuple[np.ndarray, np.ndarray, np.ndarray]) -> None:
+    """
+    Project the origin onto segments x/y[seg_a] -> x/y[seg_b] (planar km)
+    and store each group's closest point in best = (squared dist, x, y),
+    indexed by group id. Ties go to the earliest segment, as with argmin.
+    """
+    if len(seg_a) == 0:
+        return
+    ax, ay = x[seg_a], y[seg_a]
+    dx, dy = x[seg_b] - ax, y[seg_b] - ay
+    len2 = dx * dx + dy * dy
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t = np.where(len2 > 0, -(ax * dx + ay * dy) / len2, 0.0)
+    np.clip(t, 0.0, 1.0, out=t)
+    px = ax + t * dx
+    py = ay + t * dy
+    d2 = px * px + py * py
+
+    # First segment of each group once sorted by (group, distance)
+    order = np.lexsort((d2, seg_group))
+    groups = seg_group[order]
+    first = np.ones(len(order), dtype=bool)
+    first[1:] = groups[1:] != groups[:-1]
+    win, groups = order[first], groups[first]
+    best[0][groups] = d2[win]
+    best[1][groups] = px[win]
+    best[2][groups] = py[win]
+
+
+def nearest_on_polylines(qlat: float, qlon: float, coords: np.ndarray,
+                         offsets: np.ndarray, path_group: np.ndarray, n_groups: int,
+                         radius_km: Optional[float] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Find the nearest point to (qlat, qlon) on each of n_groups polylines
+    (e.g. one per feature) in CSR form (see pack_paths), where path k
+    belongs to group path_group[k]. All segments of all groups are
+    projected in one vectorized pass in a local equirectangular frame (km)
+    centred on the query point, which is accurate to metres at the
+    tens-of-km radii used here. Single-vertex paths are treated as points.
+    If radius_km is given, segments whose bounding box misses the search
+    square are skipped; a group's full segment set is only projected when
+    nothing within radius_km is found, so the result is the same either way.
+    Returns (distance_km, lat, lon) arrays of length n_groups; inf/nan for
+    groups without vertices
+    """
+    n = len(coords)
+    best = (np.full(n_groups, np.inf), np.zeros(n_groups), np.zeros(n_groups))
+    kx = KM_PER_DEG * math.cos(math.radians(qlat))
+
+    if n:
+        lengths = np.diff(offsets)
+        # Segment i -> i+1 exists unless i is the last vertex of its path
+        seg_start = np.ones(n, dtype=bool)
+        seg_start[offsets[1:][lengths > 0] - 1] = False
+        seg_a = np.flatnonzero(seg_start)
+        seg_b = seg_a + 1
+        singles = offsets[:-1][lengths == 1]
+        if len(singles):
+            seg_a = np.concatenate((seg_a, singles))
+            seg_b = np.concatenate((seg_b, singles))
+        seg_group = np.repeat(np.asarray(path_group, dtype=np.intp), lengths)[seg_a]
+
+        x = (coords[:, 0] - qlon) * kx
+        y = (coords[:, 1] - qlat) * KM_PER_DEG
+
+        if radius_km is None:
+            _closest_per_group(x, y, seg_a, seg_b, seg_group, best)
+        else:
+            # Cheap rejection: both endpoints beyond the same side of the square
+            r = radius_km
+            xa, xb, ya, yb = x[seg_a], x[seg_b], y[seg_a], y[seg_b]
+            keep = ~(((xa > r) & (xb > r)) | ((xa < -r) & (xb < -r))
+                     | ((ya > r) & (yb > r)) | ((ya < -r) & (yb < -r)))
+            _closest_per_group(x, y, seg_a[keep], seg_b[keep], seg_group[keep], best)
+            # A skipped segment could still be closer for groups left beyond r
+            redo = (best[0] > r * r)[seg_group]
+            if redo.any():
+                _closest_per_group(x, y, seg_a[redo], seg_b[redo], seg_group[redo], best)
+
+    d2, px, py = best
+    found = np.isfinite(d2)
+    nlat = np.where(found, qlat + py / KM_PER_DEG, np.nan)
+    nlon = np.where(found, qlon + px / kx, np.nan)
+    dist = np.where(found, haversine_distance_vec(qlat, qlon, nlat, nlon), np.inf)
+    return dist, nlat, nlon
+
+
+def nearest_on_polyline(qlat: float, qlon: float, coords: np.ndarray,
+                        offsets: np.ndarray,
+                        radius_km: Optional[float] = None) -> Tuple[float, Optional[Tuple[float, float]]]:
+    """
+    Find the nearest point to (qlat, qlon) on a set of polylines in CSR form
+    (see pack_paths), treated as a single feature (see nearest_on_polylines)
+    Returns (distance_km, (lat, lon)), or (inf, None) if there are no vertices
+    """
+    path_group = np.zeros(len(offsets) - 1, dtype=np.intp)
+    dist, nlat, nlon = nearest_on_polylines(qlat, qlon, coords, offsets,
+                                            path_group, 1, radius_km)
+    if not np.isfinite(dist[0]):
+        return math.inf, None
+    return float(dist[0]), (float(nlat[0]), float(nlon[0]))
+
+
+# Spherical Web Mercator (EPSG:3857) half-extent in metres, and the
+# latitude limit where its square world map ends
+MERCATOR_HALF_EXTENT = 20037508.34
+MERCATOR_MAX_LAT = 85.05112878
+
+
+def to_web_mercator(lat: float, lon: float) -> Tuple[float, float]:
+    """
+    Convert WGS84 degrees to Web Mercator (EPSG:3857) metres
+    Latitudes are clamped to +/-MERCATOR_MAX_LAT, where y would diverge
+    """
+    lat = max(-MERCATOR_MAX_LAT, min(MERCATOR_MAX_LAT, lat))
+    x = lon * MERCATOR_HALF_EXTENT / 180
+    y = math.asinh(math.tan(math.radians(lat))) * MERCATOR_HALF_EXTENT / math.pi
+    return x, y
+
+
+# Statute miles per kilometre
+MILES_PER_KM = 0.621371
+
+
 def km_to_miles(km: float) -> float:
     """Convert kilometers to miles"""
-    return km * 0.621371
+    return km * MILES_PER_KM
 
 
 def miles_to_km(miles: float) -> float:
     """Convert miles to kilometers"""
-    return miles / 0.621371
+    return miles / MILES_PER_KM
+
+
+# Compass points clockwise from north, one per 45° sector
+COMPASS_POINTS = ("N", "NE", "E", "SE", "S", "SW", "W", "NW")
+
+
+def compass_origin(lat: float, lon: float) -> Tuple[float, float, float]:
+    """
+    Precompute the origin terms used by compass_direction_from_rad
+    Returns (lon_radians, sin(lat), cos(lat))
+    """
+    lat_r = math.radians(lat)
+    return math.radians(lon), math.sin(lat_r), math.cos(lat_r)
+
+
+def compass_direction_from_rad(from_lon_r: float, sin_from: float, cos_from: float,
+                               to_lat: float, to_lon: float) -> str:
+    """
+    compass_direction with the origin already converted (see compass_origin),
+    for scoring many features against the same query point
+    """
+    to_lat = math.radians(to_lat)
+    dlon = math.radians(to_lon) - from_lon_r
+    cos_to = math.cos(to_lat)
+    y = math.sin(dlon) * cos_to
+    x = cos_from * math.sin(to_lat) - sin_from * cos_to * math.cos(dlon)
+
+    # Bearing normalized to 0-360 degrees
+    bearing = (math.degrees(math.atan2(y, x)) + 360) % 360
+    return COMPASS_POINTS[round(bearing / 45) % 8]
 
 
 def compass_direction(from_lat: float, from_lon: float, to_lat: float, to_lon: float) -> str:
@@ -41,33 +233,14 @@ def compass_direction(from_lat: float, from_lon: float, to_lat: float, to_lon: f
     Calculate the compass direction from one point to another
     Returns direction as string: N, NE, E, SE, S, SW, W, NW
     """
-    # Convert to radians
-    from_lat, from_lon, to_lat, to_lon = map(math.radians, [from_lat, from_lon, to_lat, to_lon])
-    
-    # Calculate bearing
-    dlon = to_lon - from_lon
-    y = math.sin(dlon) * math.cos(to_lat)
-    x = (math.cos(from_lat) * math.sin(to_lat) - 
-         math.sin(from_lat) * math.cos(to_lat) * math.cos(dlon))
-    
-    # Get bearing in radians and convert to degrees
-    bearing = math.atan2(y, x)
-    bearing = math.degrees(bearing)
-    
-    # Normalize to 0-360 degrees
-    bearing = (bearing + 360) % 360
-    
-    # Convert to compass direction
-    directions = ["N", "NE", "E", "SE", "S", "SW", "W", "NW"]
-    index = round(bearing / 45) % 8
-    
-    return directions[index]
+    return compass_direction_from_rad(*compass_origin(from_lat, from_lon), to_lat, to_lon)
 
 
-def create_bbox_from_point(lat: float, lon: float, radius_km: float) -> List[float]:
+def create_bbox_from_point(lat: float, lon: float,
+                           radius_km: float) -> Tuple[float, float, float, float]:
     """
     Create a bounding box around a point with given radius
-    Returns [west, south, east, north] in decimal degrees
+    Returns (west, south, east, north) in decimal degrees
     """
     # Approximate conversion from km to degrees
     # 1 degree of latitude ≈ 111 km
@@ -76,15 +249,10 @@ def create_bbox_from_point(lat: float, lon: float, radius_km: float) -> List[flo
     lat_offset = radius_km / 111.0
     lon_offset = radius_km / (111.0 * math.cos(math.radians(lat)))
     
-    west = lon - lon_offset
-    east = lon + lon_offset
-    south = lat - lat_offset
-    north = lat + lat_offset
-    
-    return [west, south, east, north]
+    return (lon - lon_offset, lat - lat_offset, lon + lon_offset, lat + lat_offset)
 
 
-def point_in_bbox(lat: float, lon: float, bbox: List[float]) -> bool:
+def point_in_bbox(lat: float, lon: float, bbox: Sequence[float]) -> bool:
     """
     Check if a point is within a bounding box
     bbox format: [west, south, east, north]
@@ -121,7 +289,7 @@ def format_coordinates(lat: float, lon: float) -> str:
     return f"{lat_dms}, {lon_dms}"
 
 
-def calculate_area_km2(bbox: List[float]) -> float:
+def calculate_area_km2(bbox: Sequence[float]) -> float:
     """
     Approximate area calculation for a bounding box in km²
     bbox format: [west, south, east, north]
@@ -0,0 +1,109 @@
+"""
+Shared HTTP session, JSON codec and on-disk response cache for the lookups
+"""
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+import time
+from typing import Callable, Dict, Any
+
+try:
+    import orjson
+except ImportError:  # optional: fall back to the stdlib codec
+    orjson = None
+
+
+CACHE_DIR = "cache"
+
+# One keep-alive session shared by every query, so the per-host TLS
+# handshakes are paid once per run instead of once per request. Transient
+# gateway errors are retried with a short backoff.
+SESSION = requests.Session()
+SESSION.mount("https://", HTTPAdapter(
+    pool_connections=8, pool_maxsize=16,
+    max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[502, 503, 504]),
+))
+SESSION.headers.update({
+    "Accept-Encoding": "gzip, deflate",
+    "User-Agent": "site-scout/1.1",
+})
+
+
+def ensure_cache_dir():
+    """Create cache directory if it doesn't exist"""
+    os.makedirs(CACHE_DIR, exist_ok=True)
+
+
+def json_loads(raw: bytes) -> Any:
+    """Decode JSON bytes, with orjson when it is installed"""
+    return orjson.loads(raw) if orjson is not None else json.loads(raw)
+
+
+def json_dumps(obj: Any, indent: bool = False) -> bytes:
+    """Encode obj as JSON bytes (2-space indented if asked), with orjson when it is installed"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else None)
+    return json.dumps(obj, indent=2 if indent else None).encode()
+
+
+def _arcgis_cacheable(data: Dict[str, Any]) -> bool:
+    """ArcGIS reports query failures as a 200 response with an "error" object"""
+    return not data.get("error")
+
+
+def cached_get(url: str, params: Dict[str, Any], timeout: float = 30,
+               ttl_days: float = 7,
+               cacheable: Callable[[Dict[str, Any]], bool] = _arcgis_cacheable) -> Dict[str, Any]:
+    """
+    GET a JSON endpoint through the on-disk cache in CACHE_DIR.
+    Entries are gzipped JSON keyed by a hash of (url, params) and are reused
+    for ttl_days. Only responses that pass `cacheable` are stored; the
+    default skips ArcGIS error payloads.
+    """
+    key = hashlib.blake2b(
+        repr((url, sorted(params.items()))).encode(), digest_size=16
+    ).hexdigest()
+    path = os.path.join(CACHE_DIR, f"{key}.json.gz")
+
+    try:
+        if time.time() - os.stat(path).st_mtime < ttl_days * 86400:
+            with gzip.open(path, "rb") as f:
+                return json_loads(f.read())
+    except (OSError, EOFError, ValueError):
+        pass  # missing, stale, truncated or corrupt entry -> refetch
+
+    resp = SESSION.get(url, params=params, timeout=timeout)
+    resp.raise_for_status()
+    data = json_loads(resp.content)
+
+    if cacheable(data):
+        _store(path, data)
+    return data
+
+
+def _store(path: str, data: Dict[str, Any]) -> None:
+    """
+    Atomically write data as a gzipped cache entry. The cache is only an
+    optimization, so any filesystem failure (read-only checkout, full
+    disk) is swallowed and the caller keeps its fetched response.
+    """
+    tmp = None
+    try:
+        ensure_cache_dir()
+        # Unique tmp name per writer: threads of one process may store the same key
+        fd, tmp = tempfile.mkstemp(dir=CACHE_DIR, suffix=".tmp")
+        with os.fdopen(fd, "wb") as raw, gzip.GzipFile(fileobj=raw, mode="wb") as f:
+            f.write(json_dumps(data))
+        os.replace(tmp, path)
+    except OSError:
+        if tmp is not None:
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
@@ -9,15 +9,25 @@ Data sources:
   - City Limits: Census TIGERweb Incorporated Places (polygon boundaries)
 """
 
-import requests
-import json
-import os
+import numpy as np
+import shapely
+from shapely.geometry import Point, Polygon
+from shapely.ops import nearest_points
+import heapq
+import logging
 import math
-from typing import List, Dict, Any, Tuple, Optional
-from .geo_utils import haversine_distance, km_to_miles, compass_direction
-
+import re
+from functools import lru_cache
+from typing import List, Dict, Any, Tuple, Optional, Pattern
+from .geo_utils import (
+    haversine_distance, haversine_distance_vec, MILES_PER_KM,
+    compass_origin, compass_direction_from_rad,
+    pack_paths, nearest_on_polyline, nearest_on_polylines, to_web_mercator,
+    create_bbox_from_point,
+)
+from .http_cache import SESSION, ensure_cache_dir, json_loads, cached_get
 
-CACHE_DIR = "cache"
+logger = logging.getLogger(__name__)
 
 # ---- Verified working API endpoints (Feb 2026) ----
 PIPELINE_URL = (
@@ -28,58 +38,161 @@ TRANSMISSION_URL = (
     "https://services1.arcgis.com/Hp6G80Pky0om7QvQ/arcgis/rest/services/"
     "Electric_Power_Transmission_Lines/FeatureServer/0/query"
 )
+# Decimal places for returned polyline/polygon vertices (~0.1 m). ArcGIS
+# otherwise serializes full doubles, roughly doubling the payload to parse.
+GEOMETRY_PRECISION = 6
+
 FCC_BROADBAND_VIEWER = (
     "https://broadbandmap.fcc.gov/location-summary/fixed"
     "?speed=25&latency=0&satellite=true&lat={lat}&lon={lon}"
 )
 
 
-def ensure_cache_dir():
-    if not os.path.exists(CACHE_DIR):
-        os.makedirs(CACHE_DIR)
+# Point queries are snapped to this grid (degrees, ~110 m) and the search
+# distance rounded up to SNAP_RADIUS_STEP_KM, so nearby repeat scouts share
+# one cached superset response that is then filtered by true distance
+SNAP_GRID_DEG = 0.001
+SNAP_RADIUS_STEP_KM = 5
+# That padded search (and the union envelope of the batch queries) can match
+# more rows than one page holds, so capped searches are paged (up to this
+# many pages) instead of truncated
+MAX_RESULT_PAGES = 10
 
 
-def _nearest_on_paths(plat: float, plon: float,
-                      paths: List[List]) -> Tuple[float, Optional[Tuple[float, float]]]:
+def _sql_quote(value: str) -> str:
+    """Quote a string literal for an ArcGIS where clause"""
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def _arcgis_point_geom(lat: float, lon: float) -> str:
     """
-    Find the true nearest point on polyline paths using Shapely projection.
-    This projects onto line segments (not just vertices), giving <100m accuracy
-    vs the ~3km error of vertex-only approach.
+    ArcGIS point geometry param in WGS84; same text json.dumps would give
+    for the fixed {"x", "y", "spatialReference"} shape, so cache keys match
     """
-    from shapely.geometry import Point, LineString, MultiLineString
-    from shapely.ops import nearest_points
+    return f'{{"x": {float(lon)!r}, "y": {float(lat)!r}, "spatialReference": {{"wkid": 4326}}}}'
 
-    query_pt = Point(plon, plat)  # Shapely uses (x=lon, y=lat)
-    best_dist = 999999
-    best_nearest = None
 
-    for path in paths:
-        if len(path) < 2:
-            # Single point — fall back to direct distance
-            if path:
-                c = path[0]
-                d = haversine_distance(plat, plon, c[1], c[0])
-                if d < best_dist:
-                    best_dist = d
-                    best_nearest = (c[1], c[0])
-            continue
+def _snapped_point_search(lat: float, lon: float, radius_km: float) -> Tuple[str, float]:
+    """
+    Return (geometry, distance_km) params for a cache-friendly ArcGIS point
+    search whose result covers radius_km around the exact (lat, lon)
+    """
+    slat = round(lat / SNAP_GRID_DEG) * SNAP_GRID_DEG
+    slon = round(lon / SNAP_GRID_DEG) * SNAP_GRID_DEG
+    geometry = _arcgis_point_geom(round(slat, 6), round(slon, 6))
+    # Pad by the largest snap offset (half a cell diagonal, < 0.1 km)
+    steps = math.ceil((radius_km + 0.1) / SNAP_RADIUS_STEP_KM)
+    return geometry, steps * SNAP_RADIUS_STEP_KM
+
 
+def _cached_get_all(url: str, params: Dict[str, Any], order_by: str,
+                    timeout: float = 30) -> Dict[str, Any]:
+    """
+    cached_get that follows exceededTransferLimit with resultOffset paging,
+    so a row cap never silently drops matching features. Pages are ordered
+    by order_by to keep offsets stable and are cached individually.
+    """
+    params = {**params, "orderByFields": order_by}
+    data = cached_get(url, params, timeout=timeout)
+    if data.get("error") or not data.get("exceededTransferLimit"):
+        return data
+
+    features = list(data.get("features", []))
+    page = data
+    for _ in range(MAX_RESULT_PAGES - 1):
+        page = cached_get(url, {**params, "resultOffset": len(features)}, timeout=timeout)
+        if page.get("error"):
+            return page
+        features.extend(page.get("features", []))
+        if not page.get("exceededTransferLimit") or not page.get("features"):
+            break
+    else:
+        logger.warning("Stopped paging %s after %d pages; results may be incomplete",
+                       url, MAX_RESULT_PAGES)
+
+    return {**data, "features": features,
+            "exceededTransferLimit": bool(page.get("exceededTransferLimit"))}
+
+
+def _nearest_on_paths(plat: float, plon: float, paths: List[List],
+                      radius_km: Optional[float] = None) -> Tuple[float, Optional[Tuple[float, float]]]:
+    """
+    Find the true nearest point on polyline paths by projecting onto every
+    line segment (not just vertices), giving <100m accuracy vs the ~3km error
+    of the vertex-only approach. All paths of a feature are handled in one
+    vectorized NumPy pass; segments outside the radius_km search square
+    are rejected before projection.
+    """
+    try:
+        coords, offsets = pack_paths(paths)
+    except (ValueError, TypeError, IndexError):
+        return 999999, None  # malformed geometry
+    return nearest_on_polyline(plat, plon, coords, offsets, radius_km)
+
+
+def _nearest_on_features(plat: float, plon: float, feature_paths: List[List],
+                         radius_km: Optional[float] = None) -> List[Tuple[float, Optional[Tuple[float, float]]]]:
+    """
+    _nearest_on_paths for every feature of a response at once: all paths are
+    packed into one CSR array and projected in a single NumPy pass. Falls
+    back to one feature at a time if any geometry is malformed.
+    """
+    try:
+        coords, offsets = pack_paths([path for paths in feature_paths for path in paths])
+    except (ValueError, TypeError, IndexError):
+        return [_nearest_on_paths(plat, plon, paths, radius_km) for paths in feature_paths]
+    path_feature = np.repeat(np.arange(len(feature_paths)),
+                             [len(paths) for paths in feature_paths])
+    dists, nlats, nlons = nearest_on_polylines(plat, plon, coords, offsets, path_feature,
+                                               len(feature_paths), radius_km)
+    return [
+        (d, (a, b)) if d != math.inf else (999999, None)
+        for d, a, b in zip(dists.tolist(), nlats.tolist(), nlons.tolist())
+    ]
+
+
+def _nearest_on_boundaries(query_pt: Point,
+                           polys: List[Polygon]) -> List[Optional[Tuple[bool, float, float]]]:
+    """
+    For each polygon: (contains query_pt, lat, lon of the nearest point on
+    its exterior ring), computed with Shapely's vectorized GEOS functions.
+    Polygons GEOS rejects are retried one at a time and give None.
+    """
+    try:
+        arr = np.asarray(polys, dtype=object)
+        inside = shapely.contains(arr, query_pt).tolist()
+        ends = shapely.get_point(shapely.shortest_line(query_pt, shapely.get_exterior_ring(arr)), 1)
+        xy = shapely.get_coordinates(ends).tolist()
+        return [(i, y, x) for i, (x, y) in zip(inside, xy)]
+    except shapely.errors.GEOSException:
+        pass
+
+    hits = []
+    for poly in polys:
         try:
-            line = LineString(path)  # path coords are (lon, lat)
-            np_on_line = nearest_points(query_pt, line)[1]
-            d = haversine_distance(plat, plon, np_on_line.y, np_on_line.x)
-            if d < best_dist:
-                best_dist = d
-                best_nearest = (np_on_line.y, np_on_line.x)  # (lat, lon)
+            pt = nearest_points(query_pt, poly.exterior)[1]
+            hits.append((poly.contains(query_pt), pt.y, pt.x))
         except Exception:
-            # Fallback to vertex method if Shapely fails
-            for c in path:
-                d = haversine_distance(plat, plon, c[1], c[0])
-                if d < best_dist:
-                    best_dist = d
-                    best_nearest = (c[1], c[0])
+            hits.append(None)
+    return hits
+
+
+def _closest(candidates: List[tuple], limit: Optional[int]) -> List[tuple]:
+    """
+    Order (rounded_distance_km, ...) tuples nearest first, keeping only the
+    first `limit` if given. Same order as sorting the finished result dicts.
+    """
+    if limit is None:
+        return sorted(candidates, key=lambda c: c[0])
+    return heapq.nsmallest(limit, candidates, key=lambda c: c[0])
+
 
-    return best_dist, best_nearest
+@lru_cache(maxsize=16)
+def _operator_regex(operators: Tuple[str, ...]) -> Optional[Pattern]:
+    """Case-insensitive substring matcher for any of the given operators"""
+    if not operators:
+        return None
+    return re.compile("|".join(re.escape(op) for op in operators), re.IGNORECASE)
 
 
 def _google_maps_link(lat: float, lon: float) -> str:
@@ -90,9 +203,80 @@ def _google_maps_link(lat: float, lon: float) -> str:
 # Pipelines — EIA Natural Gas Pipelines
 # ============================================================
 
+def _pipeline_features(data: Dict[str, Any], operators: Optional[List[str]],
+                       include_all: bool) -> List[Tuple[Dict[str, Any], str, bool, List]]:
+    """(attrs, operator, is_target, paths) for every pipeline worth scoring"""
+    kept = []
+    op_regex = _operator_regex(tuple(operators or ()))
+
+    for feat in data.get("features", []):
+        attrs = feat["attributes"]
+        geom = feat.get("geometry", {})
+        paths = geom.get("paths", [])
+        if not paths:
+            continue
+
+        operator = attrs.get("Operator", "Unknown")
+        is_target = bool(op_regex.search(operator)) if op_regex else False
+        if not is_target and op_regex and not include_all:
+            continue
+        kept.append((attrs, operator, is_target, paths))
+    return kept
+
+
+def _pipeline_results(lat: float, lon: float, kept: List[Tuple[Dict[str, Any], str, bool, List]],
+                      radius_km: float, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Score _pipeline_features output against one point, nearest first (only
+    the `limit` nearest if given). Pipelines beyond radius_km are dropped.
+    """
+    nearest_all = _nearest_on_features(lat, lon, [k[3] for k in kept], radius_km)
+
+    candidates = []
+    seen = set()
+    for (attrs, operator, is_target, _), (dist, nearest) in zip(kept, nearest_all):
+        if nearest is None or dist > radius_km:
+            continue
+
+        dedup_key = (operator, round(dist))
+        if dedup_key in seen:
+            continue
+        seen.add(dedup_key)
+        candidates.append((round(dist, 1), dist, nearest, operator, is_target, attrs))
+
+    # Only the survivors get the full result dict
+    origin = compass_origin(lat, lon)
+    results = []
+    for dist_km, dist, (nlat, nlon), operator, is_target, attrs in _closest(candidates, limit):
+        fid = attrs.get("FID")
+        eia_url = (
+            f"https://services2.arcgis.com/FiaPA4ga0iQKduv3/arcgis/rest/services/"
+            f"Natural_Gas_Interstate_and_Intrastate_Pipelines_1/FeatureServer/0/"
+            f"query?where=FID={fid}&outFields=*&f=html"
+        ) if fid else None
+
+        results.append({
+            "operator": operator,
+            "type": attrs.get("TYPEPIPE", "Unknown"),
+            "status": attrs.get("Status", "Unknown"),
+            "distance_km": dist_km,
+            "distance_mi": round(dist * MILES_PER_KM, 1),
+            "nearest_point_lat": round(nlat, 6),
+            "nearest_point_lon": round(nlon, 6),
+            "direction": compass_direction_from_rad(*origin, nlat, nlon),
+            "is_target_operator": is_target,
+            "google_maps_link": _google_maps_link(nlat, nlon),
+            "eia_record_url": eia_url,
+            "data_source": "EIA Natural Gas Interstate & Intrastate Pipelines (ArcGIS FeatureServer)",
+        })
+
+    return results
+
+
 def query_pipelines(lat: float, lon: float, radius_km: float,
                     operators: Optional[List[str]] = None,
-                    include_all: bool = True) -> List[Dict[str, Any]]:
+                    include_all: bool = True,
+                    limit: Optional[int] = None) -> List[Dict[str, Any]]:
     """
     Query EIA ArcGIS for natural gas pipelines near a point.
 
@@ -102,196 +286,272 @@ def query_pipelines(lat: float, lon: float, radius_km: float,
         operators: Filter to these operators (e.g. ["Kinder Morgan", "Targa"]).
                    If include_all=True, also returns non-matching pipelines.
         include_all: If True, return all pipelines + flag target operators.
+        limit: Only build results for this many nearest pipelines.
 
     Returns:
         Sorted list of pipeline dicts with distances and verification links.
     """
     ensure_cache_dir()
-    geometry = json.dumps({
-        "x": lon, "y": lat,
-        "spatialReference": {"wkid": 4326}
-    })
+    geometry, search_km = _snapped_point_search(lat, lon, radius_km)
 
     params = {
         "f": "json",
         "geometry": geometry,
         "geometryType": "esriGeometryPoint",
         "spatialRel": "esriSpatialRelIntersects",
-        "distance": radius_km,
+        "distance": search_km,
         "units": "esriSRUnit_Kilometer",
         "outFields": "FID,Operator,TYPEPIPE,Status",
         "returnGeometry": "true",
+        "geometryPrecision": GEOMETRY_PRECISION,
         "outSR": "4326",
         "resultRecordCount": 100,
     }
 
-    # Optionally filter by operator
-    if operators and not include_all:
-        clauses = [f"Operator LIKE '%{op}%'" for op in operators]
-        params["where"] = " OR ".join(clauses)
-    else:
-        params["where"] = "1=1"
+    # Operators are matched client-side, so the request (and its cache
+    # entry) does not depend on the operator list
+    params["where"] = "1=1"
 
     try:
-        resp = requests.get(PIPELINE_URL, params=params, timeout=30)
-        resp.raise_for_status()
-        data = resp.json()
+        data = _cached_get_all(PIPELINE_URL, params, order_by="FID")
 
         if data.get("error"):
-            print(f"Warning: Pipeline API error: {data['error'].get('message')}")
+            logger.warning("Pipeline API error: %s", data["error"].get("message"))
             return []
 
-        results = []
-        seen = set()
-        target_ops = [o.lower() for o in (operators or [])]
+        kept = _pipeline_features(data, operators, include_all)
+        return _pipeline_results(lat, lon, kept, radius_km, limit=limit)
 
-        for feat in data.get("features", []):
-            attrs = feat["attributes"]
-            geom = feat.get("geometry", {})
-            paths = geom.get("paths", [])
-            if not paths:
-                continue
+    except Exception as e:
+        logger.warning("Pipeline query failed: %s", e)
+        return []
 
-            dist, nearest = _nearest_on_paths(lat, lon, paths)
-            if nearest is None:
-                continue
 
-            operator = attrs.get("Operator", "Unknown")
-            dedup_key = f"{operator}_{round(dist, 0)}"
-            if dedup_key in seen:
-                continue
-            seen.add(dedup_key)
+def batch_query_pipelines(points: List[Tuple[float, float]], radius_km: float,
+                          operators: Optional[List[str]] = None,
+                          include_all: bool = True,
+                          limit: Optional[int] = None) -> List[List[Dict[str, Any]]]:
+    """
+    query_pipelines for many (lat, lon) points with one paged search.
 
-            is_target = any(t in operator.lower() for t in target_ops) if target_ops else False
-            nlat, nlon = nearest
-            fid = attrs.get("FID")
-            eia_url = (
-                f"https://services2.arcgis.com/FiaPA4ga0iQKduv3/arcgis/rest/services/"
-                f"Natural_Gas_Interstate_and_Intrastate_Pipelines_1/FeatureServer/0/"
-                f"query?where=FID={fid}&outFields=*&f=html"
-            ) if fid else None
+    Pipelines are fetched once for the envelope covering every point's
+    search box and scored against each point in turn.
+    Returns one result list per point, in input order.
+    """
+    if not points:
+        return []
+    ensure_cache_dir()
 
-            results.append({
-                "operator": operator,
-                "type": attrs.get("TYPEPIPE", "Unknown"),
-                "status": attrs.get("Status", "Unknown"),
-                "distance_km": round(dist, 1),
-                "distance_mi": round(km_to_miles(dist), 1),
-                "nearest_point_lat": round(nlat, 6),
-                "nearest_point_lon": round(nlon, 6),
-                "direction": compass_direction(lat, lon, nlat, nlon),
-                "is_target_operator": is_target,
-                "google_maps_link": _google_maps_link(nlat, nlon),
-                "eia_record_url": eia_url,
-                "data_source": "EIA Natural Gas Interstate & Intrastate Pipelines (ArcGIS FeatureServer)",
-            })
+    boxes = [create_bbox_from_point(lat, lon, radius_km) for lat, lon in points]
+    params = {
+        "f": "json",
+        "where": "1=1",
+        "geometry": ",".join(str(v) for v in (
+            min(b[0] for b in boxes), min(b[1] for b in boxes),
+            max(b[2] for b in boxes), max(b[3] for b in boxes),
+        )),
+        "geometryType": "esriGeometryEnvelope",
+        "inSR": "4326",
+        "outSR": "4326",
+        "spatialRel": "esriSpatialRelIntersects",
+        "outFields": "FID,Operator,TYPEPIPE,Status",
+        "returnGeometry": "true",
+        "geometryPrecision": GEOMETRY_PRECISION,
+        "resultRecordCount": 2000,
+    }
 
-        results.sort(key=lambda x: x["distance_km"])
-        return results
+    try:
+        data = _cached_get_all(PIPELINE_URL, params, order_by="FID")
+
+        if data.get("error"):
+            logger.warning("Pipeline API error: %s", data["error"].get("message"))
+            return [[] for _ in points]
+
+        kept = _pipeline_features(data, operators, include_all)
+        return [
+            _pipeline_results(lat, lon, kept, radius_km, limit=limit)
+            for lat, lon in points
+        ]
 
     except Exception as e:
-        print(f"Warning: Pipeline query failed: {e}")
-        return []
+        logger.warning("Pipeline batch query failed: %s", e)
+        return [[] for _ in points]
 
 
 # ============================================================
 # Transmission Lines — HIFLD Electric Power Transmission Lines
 # ============================================================
 
-def query_transmission_lines(lat: float, lon: float, radius_km: float,
-                             min_voltage_kv: int = 69) -> List[Dict[str, Any]]:
+def _transmission_params(xmin: float, ymin: float, xmax: float, ymax: float,
+                         min_voltage_kv: int, record_count: int = 100) -> Dict[str, Any]:
     """
-    Query HIFLD for electric power transmission lines near a point.
-
-    Note: HIFLD substations endpoint no longer available (2026).
-    Using transmission lines as the best available proxy for grid access points.
+    ArcGIS query params for transmission lines crossing a Web Mercator
+    envelope. Lines below min_voltage_kv are dropped server-side too; the
+    client-side check stays for rows whose VOLTAGE is not numeric.
     """
-    ensure_cache_dir()
-
-    # Convert to Web Mercator for spatial query
-    x = lon * 20037508.34 / 180
-    y_rad = math.log(math.tan((90 + lat) * math.pi / 360)) / (math.pi / 180)
-    y = y_rad * 20037508.34 / 180
-    buf = radius_km * 1000  # meters
-
-    params = {
+    return {
         "f": "json",
-        "geometry": f"{x - buf},{y - buf},{x + buf},{y + buf}",
+        "where": f"VOLTAGE >= {min_voltage_kv}" if min_voltage_kv > 0 else "1=1",
+        "geometry": f"{xmin},{ymin},{xmax},{ymax}",
         "geometryType": "esriGeometryEnvelope",
         "inSR": "3857",
         "outSR": "4326",
         "spatialRel": "esriSpatialRelIntersects",
         "outFields": "OBJECTID_1,OWNER,VOLTAGE,VOLT_CLASS,STATUS",
         "returnGeometry": "true",
-        "resultRecordCount": 100,
+        "geometryPrecision": GEOMETRY_PRECISION,
+        "resultRecordCount": record_count,
     }
 
-    try:
-        resp = requests.get(TRANSMISSION_URL, params=params, timeout=30)
-        resp.raise_for_status()
-        data = resp.json()
-
-        if data.get("error"):
-            print(f"Warning: Transmission API error: {data['error'].get('message')}")
-            return []
-
-        results = []
-        seen = set()
 
-        for feat in data.get("features", []):
-            attrs = feat["attributes"]
-            geom = feat.get("geometry", {})
-            paths = geom.get("paths", [])
-            if not paths:
-                continue
+def _transmission_features(data: Dict[str, Any],
+                           min_voltage_kv: int) -> List[Tuple[Dict[str, Any], int, List]]:
+    """(attrs, voltage_kv, paths) for every line at or above min_voltage_kv"""
+    kept = []
+    for feat in data.get("features", []):
+        attrs = feat["attributes"]
+        geom = feat.get("geometry", {})
+        paths = geom.get("paths", [])
+        if not paths:
+            continue
 
-            voltage = attrs.get("VOLTAGE", 0)
+        voltage = attrs.get("VOLTAGE", 0)
+        if type(voltage) is not int:
+            # Rare text rows such as "138" or "kV 69"; anything else is 0
             try:
                 voltage = int(str(voltage).replace("kV", "").strip())
             except (ValueError, TypeError):
                 voltage = 0
-            if voltage < min_voltage_kv:
-                continue
+        if voltage < min_voltage_kv:
+            continue
+        kept.append((attrs, voltage, paths))
+    return kept
 
-            dist, nearest = _nearest_on_paths(lat, lon, paths)
-            if nearest is None:
-                continue
 
-            owner = attrs.get("OWNER", "Unknown")
-            dedup_key = f"{owner}_{voltage}_{round(dist, 0)}"
-            if dedup_key in seen:
-                continue
-            seen.add(dedup_key)
+def _transmission_results(lat: float, lon: float, kept: List[Tuple[Dict[str, Any], int, List]],
+                          radius_km: float, max_km: Optional[float] = None,
+                          limit: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Score _transmission_features output against one point, nearest first
+    (only the `limit` nearest if given). Lines farther than max_km (if
+    given) are dropped.
+    """
+    nearest_all = _nearest_on_features(lat, lon, [k[2] for k in kept], radius_km)
 
-            nlat, nlon = nearest
-            oid = attrs.get("OBJECTID_1")
-            hifld_url = (
-                f"https://services1.arcgis.com/Hp6G80Pky0om7QvQ/arcgis/rest/services/"
-                f"Electric_Power_Transmission_Lines/FeatureServer/0/"
-                f"query?where=OBJECTID_1={oid}&outFields=*&f=html"
-            ) if oid else None
+    candidates = []
+    seen = set()
+    for (attrs, voltage, _), (dist, nearest) in zip(kept, nearest_all):
+        if nearest is None or (max_km is not None and dist > max_km):
+            continue
 
-            results.append({
-                "owner": owner,
-                "voltage_kv": voltage,
-                "volt_class": attrs.get("VOLT_CLASS", ""),
-                "status": attrs.get("STATUS", "Unknown"),
-                "distance_km": round(dist, 1),
-                "distance_mi": round(km_to_miles(dist), 1),
-                "nearest_point_lat": round(nlat, 6),
-                "nearest_point_lon": round(nlon, 6),
-                "direction": compass_direction(lat, lon, nlat, nlon),
-                "google_maps_link": _google_maps_link(nlat, nlon),
-                "hifld_record_url": hifld_url,
-                "data_source": "HIFLD Electric Power Transmission Lines (ArcGIS FeatureServer)",
-            })
+        owner = attrs.get("OWNER", "Unknown")
+        dedup_key = (owner, voltage, round(dist))
+        if dedup_key in seen:
+            continue
+        seen.add(dedup_key)
+        candidates.append((round(dist, 1), dist, nearest, owner, voltage, attrs))
+
+    # Only the survivors get the full result dict
+    origin = compass_origin(lat, lon)
+    results = []
+    for dist_km, dist, (nlat, nlon), owner, voltage, attrs in _closest(candidates, limit):
+        oid = attrs.get("OBJECTID_1")
+        hifld_url = (
+            f"https://services1.arcgis.com/Hp6G80Pky0om7QvQ/arcgis/rest/services/"
+            f"Electric_Power_Transmission_Lines/FeatureServer/0/"
+            f"query?where=OBJECTID_1={oid}&outFields=*&f=html"
+        ) if oid else None
+
+        results.append({
+            "owner": owner,
+            "voltage_kv": voltage,
+            "volt_class": attrs.get("VOLT_CLASS", ""),
+            "status": attrs.get("STATUS", "Unknown"),
+            "distance_km": dist_km,
+            "distance_mi": round(dist * MILES_PER_KM, 1),
+            "nearest_point_lat": round(nlat, 6),
+            "nearest_point_lon": round(nlon, 6),
+            "direction": compass_direction_from_rad(*origin, nlat, nlon),
+            "google_maps_link": _google_maps_link(nlat, nlon),
+            "hifld_record_url": hifld_url,
+            "data_source": "HIFLD Electric Power Transmission Lines (ArcGIS FeatureServer)",
+        })
+
+    return results
 
-        results.sort(key=lambda x: x["distance_km"])
-        return results
+
+def query_transmission_lines(lat: float, lon: float, radius_km: float,
+                             min_voltage_kv: int = 69,
+                             limit: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Query HIFLD for electric power transmission lines near a point,
+    nearest first (only the `limit` nearest if given).
+
+    Note: HIFLD substations endpoint no longer available (2026).
+    Using transmission lines as the best available proxy for grid access points.
+    """
+    ensure_cache_dir()
+
+    # Convert to Web Mercator for spatial query
+    x, y = to_web_mercator(lat, lon)
+    buf = radius_km * 1000  # meters
+    params = _transmission_params(x - buf, y - buf, x + buf, y + buf, min_voltage_kv)
+
+    try:
+        data = cached_get(TRANSMISSION_URL, params)
+
+        if data.get("error"):
+            logger.warning("Transmission API error: %s", data["error"].get("message"))
+            return []
+
+        kept = _transmission_features(data, min_voltage_kv)
+        return _transmission_results(lat, lon, kept, radius_km, limit=limit)
 
     except Exception as e:
-        print(f"Warning: Transmission query failed: {e}")
+        logger.warning("Transmission query failed: %s", e)
+        return []
+
+
+def batch_query_transmission_lines(points: List[Tuple[float, float]], radius_km: float,
+                                   min_voltage_kv: int = 69,
+                                   limit: Optional[int] = None) -> List[List[Dict[str, Any]]]:
+    """
+    query_transmission_lines for many (lat, lon) points with one paged search.
+
+    Lines are fetched once for the envelope covering every point's search box
+    and scored against each point in turn. Unlike the single-point query,
+    results are limited to lines within radius_km of each point, since the
+    shared envelope also reaches lines near the other points.
+    Returns one result list per point, in input order.
+    """
+    if not points:
         return []
+    ensure_cache_dir()
+
+    buf = radius_km * 1000  # meters
+    xy = [to_web_mercator(lat, lon) for lat, lon in points]
+    params = _transmission_params(
+        min(x for x, _ in xy) - buf, min(y for _, y in xy) - buf,
+        max(x for x, _ in xy) + buf, max(y for _, y in xy) + buf,
+        min_voltage_kv, record_count=2000,
+    )
+
+    try:
+        data = _cached_get_all(TRANSMISSION_URL, params, order_by="OBJECTID_1")
+
+        if data.get("error"):
+            logger.warning("Transmission API error: %s", data["error"].get("message"))
+            return [[] for _ in points]
+
+        kept = _transmission_features(data, min_voltage_kv)
+        return [
+            _transmission_results(lat, lon, kept, radius_km, max_km=radius_km, limit=limit)
+            for lat, lon in points
+        ]
+
+    except Exception as e:
+        logger.warning("Transmission batch query failed: %s", e)
+        return [[] for _ in points]
 
 
 # ============================================================
@@ -311,10 +571,7 @@ def query_fiber(lat: float, lon: float) -> Dict[str, Any]:
     Data: Dec 2024 BDC, block-level BSL (Broadband Serviceable Location) counts.
     """
     viewer_url = FCC_BROADBAND_VIEWER.format(lat=lat, lon=lon)
-    geometry = json.dumps({
-        "x": lon, "y": lat,
-        "spatialReference": {"wkid": 4326}
-    })
+    geometry = _arcgis_point_geom(lat, lon)
 
     result = {
         "has_fiber": None,
@@ -327,7 +584,7 @@ def query_fiber(lat: float, lon: float) -> Dict[str, Any]:
 
     # ---- Block-level query (point-in-polygon) ----
     try:
-        resp = requests.get(f"{FCC_BDC_URL}/4/query", params={
+        resp = SESSION.get(f"{FCC_BDC_URL}/4/query", params={
             "f": "json",
             "geometry": geometry,
             "geometryType": "esriGeometryPoint",
@@ -341,7 +598,7 @@ def query_fiber(lat: float, lon: float) -> Dict[str, Any]:
             "returnGeometry": "false",
         }, timeout=20)
         resp.raise_for_status()
-        data = resp.json()
+        data = json_loads(resp.content)
 
         for feat in data.get("features", []):
             a = feat["attributes"]
@@ -375,9 +632,9 @@ def query_fiber(lat: float, lon: float) -> Dict[str, Any]:
     county_name = result.get("block_data", {}).get("county")
     if county_name:
         try:
-            resp2 = requests.get(f"{FCC_BDC_URL}/1/query", params={
+            resp2 = SESSION.get(f"{FCC_BDC_URL}/1/query", params={
                 "f": "json",
-                "where": f"CountyName='{county_name}' AND StateName='Texas'",
+                "where": f"CountyName={_sql_quote(county_name)} AND StateName='Texas'",
                 "outFields": (
                     "TotalBSLs,ServedBSLs,ServedBSLsFiber,ServedBSLsCable,"
                     "UniqueProviders,UniqueProvidersFiber"
@@ -385,7 +642,7 @@ def query_fiber(lat: float, lon: float) -> Dict[str, Any]:
                 "returnGeometry": "false",
             }, timeout=15)
             resp2.raise_for_status()
-            d2 = resp2.json()
+            d2 = json_loads(resp2.content)
             for feat in d2.get("features", []):
                 a = feat["attributes"]
                 ct = a.get("TotalBSLs", 0) or 0
@@ -419,39 +676,36 @@ CITY_LIMITS_URL = (
 )
 
 
-def query_substations(lat: float, lon: float, radius_km: float) -> List[Dict[str, Any]]:
+def query_substations(lat: float, lon: float, radius_km: float,
+                      limit: Optional[int] = None) -> List[Dict[str, Any]]:
     """
     Query HIFLD Electric Substations (Jan 2025 update).
-    Returns real substations with type, status, and connected line count.
+    Returns real substations with type, status, and connected line count,
+    nearest first (only the `limit` nearest if given).
     """
-    geometry = json.dumps({
-        "x": lon, "y": lat,
-        "spatialReference": {"wkid": 4326}
-    })
+    geometry, search_km = _snapped_point_search(lat, lon, radius_km)
 
     params = {
         "f": "json",
         "geometry": geometry,
         "geometryType": "esriGeometryPoint",
         "spatialRel": "esriSpatialRelIntersects",
-        "distance": radius_km,
+        "distance": search_km,
         "units": "esriSRUnit_Kilometer",
         "where": "1=1",
         "outFields": "OBJECTID,ID,NAME,CITY,STATE,TYPE,STATUS,COUNTY,LATITUDE,LONGITUDE,LINES,SOURCE,SOURCEDATE",
         "returnGeometry": "true",
         "outSR": "4326",
-        "resultRecordCount": 30,
+        "resultRecordCount": 100,
     }
 
     try:
-        resp = requests.get(SUBSTATIONS_URL, params=params, timeout=30)
-        resp.raise_for_status()
-        data = resp.json()
+        data = _cached_get_all(SUBSTATIONS_URL, params, order_by="OBJECTID")
 
         if data.get("error"):
             return []
 
-        results = []
+        located = []
         for feat in data.get("features", []):
             attrs = feat["attributes"]
             slat = attrs.get("LATITUDE")
@@ -462,8 +716,25 @@ def query_substations(lat: float, lon: float, radius_km: float) -> List[Dict[str
                 slon = geom.get("x")
             if not slat or not slon:
                 continue
-
-            dist = haversine_distance(lat, lon, slat, slon)
+            located.append((attrs, slat, slon))
+
+        # Score (and round) every substation in one vectorized pass
+        dists = haversine_distance_vec(
+            lat, lon, [t[1] for t in located], [t[2] for t in located]
+        )
+        km_rounded = np.round(dists, 1).tolist()
+        mi_rounded = np.round(dists * MILES_PER_KM, 1).tolist()
+
+        candidates = [
+            (dist_km, dist_mi, attrs, slat, slon)
+            for (attrs, slat, slon), dist, dist_km, dist_mi
+            in zip(located, dists.tolist(), km_rounded, mi_rounded)
+            if dist <= radius_km  # the snapped search can overshoot the radius
+        ]
+
+        origin = compass_origin(lat, lon)
+        results = []
+        for dist_km, dist_mi, attrs, slat, slon in _closest(candidates, limit):
             name = attrs.get("NAME", "Unknown")
             oid = attrs.get("OBJECTID")
             hifld_url = (
@@ -480,21 +751,20 @@ def query_substations(lat: float, lon: float, radius_km: float) -> List[Dict[str
                 "state": attrs.get("STATE", ""),
                 "source": attrs.get("SOURCE", ""),
                 "source_date": attrs.get("SOURCEDATE", ""),
-                "distance_km": round(dist, 1),
-                "distance_mi": round(km_to_miles(dist), 1),
+                "distance_km": dist_km,
+                "distance_mi": dist_mi,
                 "lat": round(slat, 6),
                 "lon": round(slon, 6),
-                "direction": compass_direction(lat, lon, slat, slon),
+                "direction": compass_direction_from_rad(*origin, slat, slon),
                 "google_maps_link": _google_maps_link(slat, slon),
                 "hifld_record_url": hifld_url,
                 "data_source": "HIFLD Electric Substations (ArcGIS, Jan 2025)",
             })
 
-        results.sort(key=lambda x: x["distance_km"])
         return results
 
     except Exception as e:
-        print(f"Warning: Substations query failed: {e}")
+        logger.warning("Substations query failed: %s", e)
         return []
 
 
@@ -504,73 +774,72 @@ def query_city_limits_distance(lat: float, lon: float, radius_km: float = 50) ->
     Uses Shapely to compute distance to the actual city boundary polygon,
     not just the centroid.
     """
-    from shapely.geometry import Point, Polygon
-    from shapely.ops import nearest_points
-
-    geometry = json.dumps({
-        "x": lon, "y": lat,
-        "spatialReference": {"wkid": 4326}
-    })
+    geometry, search_km = _snapped_point_search(lat, lon, radius_km)
 
     params = {
         "f": "json",
         "geometry": geometry,
         "geometryType": "esriGeometryPoint",
         "spatialRel": "esriSpatialRelIntersects",
-        "distance": radius_km,
+        "distance": search_km,
         "units": "esriSRUnit_Kilometer",
         "outFields": "NAME,BASENAME,LSADC,FUNCSTAT,CENTLAT,CENTLON",
         "returnGeometry": "true",
+        "geometryPrecision": GEOMETRY_PRECISION,
         "outSR": "4326",
     }
 
     try:
-        resp = requests.get(CITY_LIMITS_URL, params=params, timeout=20)
-        resp.raise_for_status()
-        data = resp.json()
+        data = _cached_get_all(CITY_LIMITS_URL, params, order_by="OBJECTID", timeout=20)
 
         if data.get("error"):
             return []
 
         query_pt = Point(lon, lat)
-        results = []
-
+        located = []
         for feat in data.get("features", []):
             attrs = feat["attributes"]
             rings = feat.get("geometry", {}).get("rings", [])
             if not rings:
                 continue
-
             try:
                 poly = Polygon(rings[0], rings[1:] if len(rings) > 1 else [])
-                inside = poly.contains(query_pt)
-
-                # Distance to nearest boundary edge
-                np_on_edge = nearest_points(query_pt, poly.exterior)[1]
-                edge_dist = haversine_distance(lat, lon, np_on_edge.y, np_on_edge.x)
-
                 centlat = float(str(attrs.get("CENTLAT", "0")).replace("+", ""))
                 centlon = float(str(attrs.get("CENTLON", "0")).replace("+", ""))
-                center_dist = haversine_distance(lat, lon, centlat, centlon)
-
-                results.append({
-                    "name": attrs.get("NAME", "Unknown"),
-                    "type": attrs.get("LSADC", ""),
-                    "inside": inside,
-                    "distance_to_boundary_km": round(edge_dist, 1),
-                    "distance_to_boundary_mi": round(km_to_miles(edge_dist), 1),
-                    "distance_to_center_km": round(center_dist, 1),
-                    "nearest_boundary_lat": round(np_on_edge.y, 6),
-                    "nearest_boundary_lon": round(np_on_edge.x, 6),
-                    "google_maps_link": _google_maps_link(np_on_edge.y, np_on_edge.x),
-                    "data_source": "US Census TIGERweb Incorporated Places",
-                })
             except Exception:
                 continue
+            if not poly.is_empty:
+                located.append((attrs, poly, centlat, centlon))
+
+        hits = _nearest_on_boundaries(query_pt, [t[1] for t in located])
+        ok = [(t, hit) for t, hit in zip(located, hits) if hit is not None]
+        # Distance to nearest boundary edge, for every place at once
+        edge_dists = haversine_distance_vec(
+            lat, lon, [hit[1] for _, hit in ok], [hit[2] for _, hit in ok]
+        ).tolist()
+
+        results = []
+        for ((attrs, _, centlat, centlon), (inside, blat, blon)), edge_dist in zip(ok, edge_dists):
+            if not inside and edge_dist > radius_km:
+                continue  # only matched the padded, snapped search
+            center_dist = haversine_distance(lat, lon, centlat, centlon)
+
+            results.append({
+                "name": attrs.get("NAME", "Unknown"),
+                "type": attrs.get("LSADC", ""),
+                "inside": inside,
+                "distance_to_boundary_km": round(edge_dist, 1),
+                "distance_to_boundary_mi": round(edge_dist * MILES_PER_KM, 1),
+                "distance_to_center_km": round(center_dist, 1),
+                "nearest_boundary_lat": round(blat, 6),
+                "nearest_boundary_lon": round(blon, 6),
+                "google_maps_link": _google_maps_link(blat, blon),
+                "data_source": "US Census TIGERweb Incorporated Places",
+            })
 
         results.sort(key=lambda x: x["distance_to_boundary_km"])
         return results
 
     except Exception as e:
-        print(f"Warning: City limits query failed: {e}")
+        logger.warning("City limits query failed: %s", e)
         return []
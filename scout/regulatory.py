@@ -2,30 +2,38 @@
 Regulatory checks for city limits and EPA attainment status
 """
 
-import requests
-import json
+import logging
 import os
-from typing import Dict, Any, List
+import threading
+from types import MappingProxyType
+from functools import lru_cache
+from typing import Dict, Any, List, Mapping
+from .http_cache import CACHE_DIR, ensure_cache_dir, json_loads, json_dumps, cached_get
 
 
-# Cache directory
-CACHE_DIR = "cache"
+logger = logging.getLogger(__name__)
+
 EPA_NONATTAINMENT_CACHE = os.path.join(CACHE_DIR, "epa_nonattainment.json")
 
 
-def ensure_cache_dir():
-    """Create cache directory if it doesn't exist"""
-    if not os.path.exists(CACHE_DIR):
-        os.makedirs(CACHE_DIR)
+CENSUS_GEOCODER_URL = "https://geocoding.geo.census.gov/geocoder/geographies/coordinates"
 
 
-def check_city_limits(lat: float, lon: float) -> Dict[str, Any]:
-    """
-    Check if coordinates fall within incorporated city limits
-    Uses US Census Bureau geocoder API
-    """
-    url = "https://geocoding.geo.census.gov/geocoder/geographies/coordinates"
-    
+def _census_cacheable(data: Dict[str, Any]) -> bool:
+    """Only store geocoder answers that carry geographies and no "errors" list"""
+    return not data.get('errors') and bool(data.get('result', {}).get('geographies'))
+
+
+# Striped locks keyed on the point, so concurrent callers for the same point
+# (city limits and EPA attainment run in parallel) share one request while
+# lookups for other points almost always proceed independently. A fixed
+# array keeps memory bounded however many points a process scouts.
+_GEOGRAPHIES_LOCK_STRIPES = 64
+_GEOGRAPHIES_LOCKS = tuple(threading.Lock() for _ in range(_GEOGRAPHIES_LOCK_STRIPES))
+
+
+@lru_cache(maxsize=256)
+def _fetch_geographies(lat: float, lon: float) -> Dict[str, Any]:
     params = {
         'x': lon,
         'y': lat,
@@ -33,11 +41,27 @@ def check_city_limits(lat: float, lon: float) -> Dict[str, Any]:
         'vintage': 'Current_Current',
         'format': 'json'
     }
-    
+    data = cached_get(CENSUS_GEOCODER_URL, params, cacheable=_census_cacheable)
+    return data.get('result', {}).get('geographies', {})
+
+
+def _census_geographies(lat: float, lon: float) -> Dict[str, Any]:
+    """
+    Census geocoder 'geographies' for a point (Counties, Incorporated
+    Places, Census Tracts, ...), fetched once per point per process.
+    Failures raise and are not cached. Treat the result as read-only.
+    """
+    with _GEOGRAPHIES_LOCKS[hash((lat, lon)) % _GEOGRAPHIES_LOCK_STRIPES]:
+        return _fetch_geographies(lat, lon)
+
+
+def check_city_limits(lat: float, lon: float) -> Dict[str, Any]:
+    """
+    Check if coordinates fall within incorporated city limits
+    Uses US Census Bureau geocoder API
+    """
     try:
-        response = requests.get(url, params=params, timeout=30)
-        response.raise_for_status()
-        data = response.json()
+        geographies = _census_geographies(lat, lon)
         
         result = {
             'in_city': False,
@@ -46,9 +70,7 @@ def check_city_limits(lat: float, lon: float) -> Dict[str, Any]:
             'state': None
         }
         
-        if 'result' in data and 'geographies' in data['result']:
-            geographies = data['result']['geographies']
-            
+        if geographies:
             # Check for incorporated places
             if 'Incorporated Places' in geographies:
                 places = geographies['Incorporated Places']
@@ -79,7 +101,7 @@ def check_city_limits(lat: float, lon: float) -> Dict[str, Any]:
         return result
         
     except Exception as e:
-        print(f"Warning: City limits check failed: {e}")
+        logger.warning("City limits check failed: %s", e)
         return {
             'in_city': False,
             'city_name': None,
@@ -89,20 +111,22 @@ def check_city_limits(lat: float, lon: float) -> Dict[str, Any]:
         }
 
 
-def load_epa_nonattainment_data() -> Dict[str, List[str]]:
+@lru_cache(maxsize=1)
+def load_epa_nonattainment_data() -> Mapping[str, List[str]]:
     """
     Load EPA nonattainment areas data from cache or download if not available
-    Returns dict mapping county FIPS codes to list of nonattainment pollutants
+    Returns a read-only mapping of county FIPS codes to lists of
+    nonattainment pollutants, loaded once per process
     """
     ensure_cache_dir()
     
     # Check if we have cached data
     if os.path.exists(EPA_NONATTAINMENT_CACHE):
         try:
-            with open(EPA_NONATTAINMENT_CACHE, 'r') as f:
-                return json.load(f)
+            with open(EPA_NONATTAINMENT_CACHE, 'rb') as f:
+                return MappingProxyType(json_loads(f.read()))
         except Exception as e:
-            print(f"Warning: Could not load cached EPA data: {e}")
+            logger.warning("Could not load cached EPA data: %s", e)
     
     # If no cache or cache failed, create minimal Texas nonattainment data
     # This is a simplified version - in production you'd download the full EPA dataset
@@ -122,36 +146,23 @@ def load_epa_nonattainment_data() -> Dict[str, List[str]]:
     }
     
     try:
-        with open(EPA_NONATTAINMENT_CACHE, 'w') as f:
-            json.dump(texas_nonattainment, f, indent=2)
+        with open(EPA_NONATTAINMENT_CACHE, 'wb') as f:
+            f.write(json_dumps(texas_nonattainment, indent=True))
     except Exception as e:
-        print(f"Warning: Could not cache EPA data: {e}")
+        logger.warning("Could not cache EPA data: %s", e)
     
-    return texas_nonattainment
+    return MappingProxyType(texas_nonattainment)
 
 
 def get_county_fips(lat: float, lon: float) -> str:
     """
     Get the county FIPS code for given coordinates
     """
-    url = "https://geocoding.geo.census.gov/geocoder/geographies/coordinates"
-    
-    params = {
-        'x': lon,
-        'y': lat,
-        'benchmark': 'Public_AR_Current',
-        'vintage': 'Current_Current',
-        'format': 'json'
-    }
-    
     try:
-        response = requests.get(url, params=params, timeout=30)
-        response.raise_for_status()
-        data = response.json()
+        geographies = _census_geographies(lat, lon)
         
-        if ('result' in data and 'geographies' in data['result'] 
-            and 'Counties' in data['result']['geographies']):
-            counties = data['result']['geographies']['Counties']
+        if 'Counties' in geographies:
+            counties = geographies['Counties']
             if counties:
                 county = counties[0]
                 state_fips = county.get('STATE')
@@ -162,7 +173,7 @@ def get_county_fips(lat: float, lon: float) -> str:
         return None
         
     except Exception as e:
-        print(f"Warning: County FIPS lookup failed: {e}")
+        logger.warning("County FIPS lookup failed: %s", e)
         return None
 
 
@@ -172,10 +183,15 @@ def check_attainment(lat: float, lon: float) -> Dict[str, Any]:
     Returns attainment status and any nonattainment pollutants
     """
     try:
-        # First get county FIPS code
-        county_fips = get_county_fips(lat, lon)
+        # One geocoder call gives both the county FIPS code and its name;
+        # a failed lookup raises into the handler below with its own message
+        geographies = _census_geographies(lat, lon)
+        counties = geographies.get('Counties') or [{}]
+        county = counties[0]
+        county_fips = f"{county.get('STATE', '')}{county.get('COUNTY', '')}"
         
-        if not county_fips:
+        # Both the 2-digit state and 3-digit county parts must be present
+        if not county_fips or len(county_fips) != 5:
             return {
                 'attainment': True,  # Default to attainment if lookup fails
                 'county': 'Unknown County',
@@ -183,15 +199,14 @@ def check_attainment(lat: float, lon: float) -> Dict[str, Any]:
                 'error': 'Could not determine county'
             }
         
-        # Get city limits info for county name
-        city_info = check_city_limits(lat, lon)
-        county_name = city_info.get('county', 'Unknown County')
+        county_name = county.get('NAME')
         
         # Load nonattainment data
         nonattainment_data = load_epa_nonattainment_data()
         
         # Check if county is in nonattainment
-        pollutants = nonattainment_data.get(county_fips, [])
+        # Copied so the result never aliases the shared cached lists
+        pollutants = list(nonattainment_data.get(county_fips, []))
         
         return {
             'attainment': len(pollutants) == 0,
@@ -201,7 +216,7 @@ def check_attainment(lat: float, lon: float) -> Dict[str, Any]:
         }
         
     except Exception as e:
-        print(f"Warning: Attainment check failed: {e}")
+        logger.warning("Attainment check failed: %s", e)
         return {
             'attainment': True,  # Default to attainment on error
             'county': 'Unknown County, TX',
@@ -0,0 +1,116 @@
+"""
+Tests for the CSR polyline projection kernel in scout.geo_utils
+"""
+
+import math
+import random
+import unittest
+
+import numpy as np
+
+from scout.geo_utils import (
+    KM_PER_DEG, haversine_distance, pack_paths,
+    nearest_on_polyline, nearest_on_polylines,
+)
+
+
+def _reference_nearest(qlat, qlon, paths):
+    """Segment-by-segment projection in the kernel's local frame; (d2, lat, lon)"""
+    kx = KM_PER_DEG * math.cos(math.radians(qlat))
+    best = (math.inf, None, None)
+    for path in paths:
+        pts = [((lon - qlon) * kx, (lat - qlat) * KM_PER_DEG) for lon, lat in path]
+        segs = list(zip(pts, pts[1:])) if len(pts) > 1 else [(p, p) for p in pts]
+        for (ax, ay), (bx, by) in segs:
+            dx, dy = bx - ax, by - ay
+            len2 = dx * dx + dy * dy
+            t = min(max(-(ax * dx + ay * dy) / len2, 0.0), 1.0) if len2 > 0 else 0.0
+            px, py = ax + t * dx, ay + t * dy
+            d2 = px * px + py * py
+            if d2 < best[0]:
+                best = (d2, qlat + py / KM_PER_DEG, qlon + px / kx)
+    return best
+
+
+def _random_paths(rng, qlat, qlon, spread):
+    return [
+        [[qlon + rng.uniform(-spread, spread), qlat + rng.uniform(-spread, spread)]
+         for _ in range(rng.randint(1, 6))]
+        for _ in range(rng.randint(1, 4))
+    ]
+
+
+class NearestOnPolylineTest(unittest.TestCase):
+
+    def test_single_vertex_path_is_a_point(self):
+        dist, nearest = nearest_on_polyline(31.9, -102.3, *pack_paths([[[-102.2, 31.95]]]))
+        self.assertEqual(nearest, (31.95, -102.2))
+        self.assertAlmostEqual(dist, haversine_distance(31.9, -102.3, 31.95, -102.2), places=9)
+
+    def test_projects_onto_segment_interior(self):
+        # Horizontal segment passing 0.01 deg north of the query point
+        dist, (lat, lon) = nearest_on_polyline(
+            31.9, -102.3, *pack_paths([[[-102.5, 31.91], [-102.1, 31.91]]]))
+        self.assertAlmostEqual(lat, 31.91, places=9)
+        self.assertAlmostEqual(lon, -102.3, places=9)
+        self.assertAlmostEqual(dist, 0.01 * KM_PER_DEG, places=6)
+
+    def test_no_vertices(self):
+        self.assertEqual(nearest_on_polyline(31.9, -102.3, *pack_paths([])), (math.inf, None))
+        self.assertEqual(nearest_on_polyline(31.9, -102.3, *pack_paths([[], []])), (math.inf, None))
+
+    def test_empty_paths_mixed_with_vertices(self):
+        dist, nearest = nearest_on_polyline(31.9, -102.3, *pack_paths([[], [[-102.3, 31.95]], []]))
+        self.assertEqual(nearest, (31.95, -102.3))
+        self.assertTrue(math.isfinite(dist))
+
+    def test_group_without_vertices(self):
+        coords, offsets = pack_paths([[[-102.3, 31.95], [-102.2, 31.95]], []])
+        dist, lat, lon = nearest_on_polylines(31.9, -102.3, coords, offsets,
+                                              np.array([0, 1]), 2)
+        self.assertTrue(math.isfinite(dist[0]))
+        self.assertEqual(dist[1], math.inf)
+        self.assertTrue(math.isnan(lat[1]) and math.isnan(lon[1]))
+
+    def test_group_beyond_radius_still_scored(self):
+        # Group 1 lies entirely outside the 5 km search square, so its
+        # segments are pruned in the first pass and scored in the redo pass
+        paths = [
+            [[-102.31, 31.9], [-102.29, 31.91]],
+            [[-102.0, 32.2], [-101.9, 32.3]],
+        ]
+        coords, offsets = pack_paths(paths)
+        groups = np.array([0, 1])
+        pruned = nearest_on_polylines(31.9, -102.3, coords, offsets, groups, 2, radius_km=5)
+        full = nearest_on_polylines(31.9, -102.3, coords, offsets, groups, 2)
+        for got, want in zip(pruned, full):
+            np.testing.assert_array_equal(got, want)
+        self.assertGreater(pruned[0][1], 5)
+
+    def test_matches_reference_and_pruning_is_exact(self):
+        rng = random.Random(7)
+        for _ in range(500):
+            qlat, qlon = 31 + rng.random(), -102 - rng.random()
+            features = [_random_paths(rng, qlat, qlon, rng.choice((0.05, 0.4, 2.0)))
+                        for _ in range(rng.randint(1, 5))]
+            paths = [p for f in features for p in f]
+            groups = np.repeat(np.arange(len(features)), [len(f) for f in features])
+            coords, offsets = pack_paths(paths)
+            radius = rng.choice((1.0, 10.0, 50.0))
+
+            full = nearest_on_polylines(qlat, qlon, coords, offsets, groups, len(features))
+            pruned = nearest_on_polylines(qlat, qlon, coords, offsets, groups,
+                                          len(features), radius_km=radius)
+            for got, want in zip(pruned, full):
+                np.testing.assert_allclose(got, want, rtol=0, atol=1e-12)
+
+            for g, feature in enumerate(features):
+                _, ref_lat, ref_lon = _reference_nearest(qlat, qlon, feature)
+                self.assertAlmostEqual(full[1][g], ref_lat, places=9)
+                self.assertAlmostEqual(full[2][g], ref_lon, places=9)
+                self.assertAlmostEqual(
+                    full[0][g], haversine_distance(qlat, qlon, ref_lat, ref_lon), places=9)
+
+
+if __name__ == "__main__":
+    unittest.main()
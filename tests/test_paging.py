@@ -0,0 +1,102 @@
+"""
+Tests for the paged ArcGIS fetch (scout.infra._cached_get_all) with a
+stubbed HTTP session and a throwaway cache directory
+"""
+
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from scout import http_cache, infra
+
+
+class _Response:
+    def __init__(self, payload):
+        self.content = json.dumps(payload).encode()
+
+    def raise_for_status(self):
+        pass
+
+
+class CachedGetAllTest(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.cache_dir = tmp.name
+        patcher = mock.patch.object(http_cache, "CACHE_DIR", tmp.name)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.calls = []
+
+    def _serve(self, page_for_offset):
+        """Stub SESSION.get with page_for_offset(offset) -> payload"""
+        def get(url, params=None, timeout=None):
+            self.calls.append(dict(params))
+            return _Response(page_for_offset(params.get("resultOffset", 0)))
+        patcher = mock.patch.object(http_cache.SESSION, "get", side_effect=get)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    @staticmethod
+    def _rows(total, page_size):
+        def page(offset):
+            ids = range(offset, min(offset + page_size, total))
+            return {"features": [{"attributes": {"FID": i}} for i in ids],
+                    "exceededTransferLimit": offset + page_size < total}
+        return page
+
+    def test_single_page(self):
+        self._serve(self._rows(3, 10))
+        data = infra._cached_get_all("https://example.test/query", {"where": "1=1"}, "FID")
+        self.assertEqual([f["attributes"]["FID"] for f in data["features"]], [0, 1, 2])
+        self.assertEqual(len(self.calls), 1)
+        self.assertEqual(self.calls[0]["orderByFields"], "FID")
+
+    def test_follows_exceeded_transfer_limit(self):
+        self._serve(self._rows(25, 10))
+        data = infra._cached_get_all("https://example.test/query", {"where": "1=1"}, "FID")
+        self.assertEqual([f["attributes"]["FID"] for f in data["features"]], list(range(25)))
+        self.assertFalse(data["exceededTransferLimit"])
+        self.assertEqual([c.get("resultOffset") for c in self.calls], [None, 10, 20])
+        self.assertTrue(all(c["orderByFields"] == "FID" for c in self.calls))
+
+    def test_pages_are_cached(self):
+        self._serve(self._rows(25, 10))
+        first = infra._cached_get_all("https://example.test/query", {"where": "1=1"}, "FID")
+        second = infra._cached_get_all("https://example.test/query", {"where": "1=1"}, "FID")
+        self.assertEqual(first, second)
+        self.assertEqual(len(self.calls), 3)
+
+    def test_error_page(self):
+        rows = self._rows(25, 10)
+        error = {"error": {"code": 500, "message": "boom"}}
+        self._serve(lambda offset: error if offset == 10 else rows(offset))
+        data = infra._cached_get_all("https://example.test/query", {"where": "1=1"}, "FID")
+        self.assertEqual(data, error)
+        # The error page is never written to the cache, so it is retried
+        self.calls.clear()
+        infra._cached_get_all("https://example.test/query", {"where": "1=1"}, "FID")
+        self.assertEqual([c.get("resultOffset") for c in self.calls], [10])
+
+    def test_stops_at_max_result_pages(self):
+        self._serve(self._rows(10 ** 6, 5))
+        with self.assertLogs("scout.infra", level="WARNING") as logs:
+            data = infra._cached_get_all("https://example.test/query", {"where": "1=1"}, "FID")
+        self.assertEqual(len(self.calls), infra.MAX_RESULT_PAGES)
+        self.assertEqual(len(data["features"]), 5 * infra.MAX_RESULT_PAGES)
+        self.assertTrue(data["exceededTransferLimit"])
+        self.assertIn("results may be incomplete", logs.output[0])
+
+    def test_unwritable_cache_still_returns_data(self):
+        self._serve(self._rows(3, 10))
+        with mock.patch.object(tempfile, "mkstemp", side_effect=PermissionError):
+            data = infra._cached_get_all("https://example.test/query", {"where": "1=1"}, "FID")
+        self.assertEqual(len(data["features"]), 3)
+        self.assertEqual(os.listdir(self.cache_dir), [])
+
+
+if __name__ == "__main__":
+    unittest.main()